@@ -145,6 +145,12 @@ scheduler_events = {
 	"cron": {
 		"*/3 * * * *": [  # Every 3 minutes
 			"policy_reader.tasks.monitor_stuck_policy_documents"
+		],
+		"* * * * *": [  # Every minute
+			"policy_reader.tasks.drain_saiba_sync_queue"
+		],
+		"*/15 * * * *": [  # Every 15 minutes
+			"policy_reader.tasks.refresh_saiba_token"
 		]
 	}
 }
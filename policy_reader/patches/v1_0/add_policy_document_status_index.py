@@ -0,0 +1,6 @@
+import frappe
+
+
+def execute():
+    """Composite index for the stuck-document monitor's status + modified filter"""
+    frappe.db.add_index("Policy Document", ["status", "modified"], index_name="status_modified_index")
@@ -114,7 +114,7 @@ class HealthPolicy(Document):
 
 			# Refresh field mappings to include latest aliases
 			try:
-				settings = frappe.get_single("Policy Reader Settings")
+				settings = frappe.get_cached_doc("Policy Reader Settings")
 				settings.refresh_field_mappings()
 				frappe.db.commit()
 				frappe.logger().info("Health Policy field mappings refreshed successfully")
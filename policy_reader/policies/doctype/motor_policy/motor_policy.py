@@ -118,7 +118,7 @@ class MotorPolicy(Document):
 
 			# Refresh field mappings to include latest aliases (including ChasisNo)
 			try:
-				settings = frappe.get_single("Policy Reader Settings")
+				settings = frappe.get_cached_doc("Policy Reader Settings")
 				settings.refresh_field_mappings()
 				frappe.db.commit()
 				frappe.logger().info("Field mappings refreshed successfully - ChasisNo mapping updated")
@@ -1,9 +1,11 @@
 # Copyright (c) 2025, Clapgrow Software and Contributors
 # See license.txt
 
-# import frappe
+import frappe
 from frappe.tests import IntegrationTestCase
 
+from policy_reader.policy_reader.services.saiba_sync_service import SaibaSyncService
+
 
 # On IntegrationTestCase, the doctype test records and all
 # link-field test record dependencies are recursively loaded
@@ -19,4 +21,40 @@ class IntegrationTestMotorPolicy(IntegrationTestCase):
 	Use this class for testing interactions between multiple components.
 	"""
 
-	pass
+	def _make_policy(self, **values):
+		return frappe.get_doc({"doctype": "Motor Policy", **values}).insert(ignore_permissions=True)
+
+	def test_bulk_sync_status_update_keeps_columns_a_row_does_not_carry(self):
+		first = self._make_policy(saiba_sync_status="Pending", saiba_sync_error="old error")
+		second = self._make_policy(saiba_sync_status="Pending", saiba_control_number="12345")
+
+		SaibaSyncService()._bulk_update_sync_status(
+			"Motor Policy",
+			{
+				first.name: {"saiba_sync_status": "Failed", "saiba_sync_error": "new error"},
+				second.name: {"saiba_sync_status": "Synced"},
+			},
+		)
+
+		first_row = frappe.db.get_value(
+			"Motor Policy", first.name, ["saiba_sync_status", "saiba_sync_error", "saiba_control_number"], as_dict=True
+		)
+		second_row = frappe.db.get_value(
+			"Motor Policy", second.name, ["saiba_sync_status", "saiba_sync_error", "saiba_control_number"], as_dict=True
+		)
+		self.assertEqual(first_row.saiba_sync_status, "Failed")
+		self.assertEqual(first_row.saiba_sync_error, "new error")
+		self.assertEqual(first_row.saiba_control_number, "Pending")
+		self.assertEqual(second_row.saiba_sync_status, "Synced")
+		self.assertFalse(second_row.saiba_sync_error)
+		self.assertEqual(second_row.saiba_control_number, "12345")
+
+	def test_bulk_sync_status_update_rejects_unknown_columns(self):
+		policy = self._make_policy(saiba_sync_status="Pending")
+
+		with self.assertRaises(frappe.ValidationError):
+			SaibaSyncService()._bulk_update_sync_status(
+				"Motor Policy", {policy.name: {"saiba_sync_status": "Synced", "policy_no": "X"}}
+			)
+
+		self.assertEqual(frappe.db.get_value("Motor Policy", policy.name, "saiba_sync_status"), "Pending")
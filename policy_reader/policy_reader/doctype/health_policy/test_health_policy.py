@@ -1,9 +1,13 @@
 # Copyright (c) 2026, Clapgrow Software and Contributors
 # See license.txt
 
-# import frappe
+from unittest.mock import patch
+
+import frappe
 from frappe.tests import IntegrationTestCase
 
+from policy_reader.policy_reader.services.saiba_sync_service import SaibaSyncService
+
 
 # On IntegrationTestCase, the doctype test records and all
 # link-field test record dependencies are recursively loaded
@@ -19,4 +23,28 @@ class IntegrationTestHealthPolicy(IntegrationTestCase):
 	Use this class for testing interactions between multiple components.
 	"""
 
-	pass
+	def setUp(self):
+		self._clear_sync_queues()
+
+	def tearDown(self):
+		self._clear_sync_queues()
+
+	def _clear_sync_queues(self):
+		for queue_key in SaibaSyncService.SYNC_QUEUE_KEYS.values():
+			frappe.cache().delete_value(queue_key)
+
+	def test_failed_drain_requeues_batch_in_original_order(self):
+		queue_key = SaibaSyncService.SYNC_QUEUE_KEYS["Health Policy"]
+		names = ["HLTPLCY-TEST-1", "HLTPLCY-TEST-2", "HLTPLCY-TEST-3"]
+		for name in names:
+			frappe.cache().rpush(queue_key, name)
+
+		service = SaibaSyncService()
+		with (
+			patch.object(service, "_is_enabled", return_value=True),
+			patch.object(service, "sync_health_policies", side_effect=Exception("GetToken failed")),
+		):
+			service.drain_sync_queues()
+
+		queued = [frappe.safe_decode(name) for name in frappe.cache().lrange(queue_key, 0, -1)]
+		self.assertEqual(queued, names)
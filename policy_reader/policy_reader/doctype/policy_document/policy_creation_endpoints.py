@@ -55,6 +55,42 @@ def create_policy_entry(policy_document_name):
         return {"success": False, "error": str(e)}
 
 
+@frappe.whitelist()
+def create_policy_entries_bulk(policy_document_names, policy_type):
+    """
+    Create policy records for several Policy Documents of the same policy type
+    in one transaction
+    """
+    try:
+        policy_document_names = frappe.parse_json(policy_document_names)
+        if not isinstance(policy_document_names, list) or not policy_document_names:
+            frappe.throw("Invalid input: policy_document_names must be a non-empty list")
+
+        # Drop repeated names so each document gets exactly one policy record
+        policy_document_names = list(dict.fromkeys(str(name) for name in policy_document_names))
+
+        policy_creation_service = PolicyCreationService()
+        for name in policy_document_names:
+            validation = policy_creation_service.validate_policy_creation_prerequisites(name)
+            if not validation["valid"]:
+                return {"success": False, "error": f"{name}: {validation['error']}"}
+
+        result = policy_creation_service.create_policy_records_bulk(policy_document_names, policy_type)
+
+        for name, entry in zip(policy_document_names, result["results"]):
+            frappe.publish_realtime('policy_created', {
+                'policy_document': name,
+                'policy_name': entry['policy_name'],
+                'policy_type': entry['policy_type']
+            })
+
+        return result
+
+    except Exception as e:
+        frappe.log_error(f"Bulk policy creation failed: {str(e)}")
+        return {"success": False, "error": str(e)}
+
+
 @frappe.whitelist()
 def get_policy_creation_status(policy_document_name):
     """
@@ -7,7 +7,7 @@ import time
 
 import frappe
 from frappe.model.document import Document
-from frappe.utils import cint, cstr, flt, getdate
+from frappe.utils import cint, cstr, flt, getdate, now_datetime, time_diff
 
 from policy_reader.policy_reader.services.api_health_service import APIHealthService
 from policy_reader.policy_reader.services.claude_vision_service import ClaudeVisionService
@@ -194,12 +194,7 @@ class PolicyDocument(Document):
 		# File validation removed - proceeding directly with processing
 
 		# Update status to Processing immediately
-		self.status = "Processing"
-		self.processing_method = "claude_vision"
-		# Store the policy type used for extraction
-		self.extraction_policy_type = self.policy_type
-		self.save()
-		frappe.db.commit()
+		self._mark_processing()
 
 		if background:
 			# Enqueue background job
@@ -259,6 +254,15 @@ class PolicyDocument(Document):
 
 				frappe.throw("Unexpected error occurred while processing with AI. Please contact support.")
 
+	def _mark_processing(self):
+		"""Flag the document as Processing with Claude Vision and commit"""
+		self.status = "Processing"
+		self.processing_method = "claude_vision"
+		# Store the policy type used for extraction
+		self.extraction_policy_type = self.policy_type
+		self.save()
+		frappe.db.commit()
+
 	def process_policy_internal(self):
 		"""Internal method for actual policy processing (runs in background) - uses Claude Vision"""
 		try:
@@ -380,11 +384,42 @@ class PolicyDocument(Document):
 		return True  # Always return True to skip validation
 
 	def get_full_file_path(self):
-		"""Get absolute path to the uploaded file - SIMPLIFIED VERSION"""
+		"""Get absolute path to the uploaded file, resolved once per attachment"""
 		if not self.policy_file:
 			frappe.throw("No file attached")
 
-		# Simple approach: just try to get the file and return its path
+		resolved = getattr(self, "_resolved_file_path", None)
+		if resolved and resolved[0] == self.policy_file:
+			return resolved[1]
+
+		file_path = self._resolve_file_path()
+		self._resolved_file_path = (self.policy_file, file_path)
+		return file_path
+
+	def _resolve_file_path(self):
+		"""Resolve policy_file to an absolute path - SIMPLIFIED VERSION"""
+		# Resolve standard /files/ and /private/files/ URLs straight to the site folder;
+		# a single stat confirms the file exists without loading the File document
+		file_path = None
+		if self.policy_file.startswith("/private/files/"):
+			files_dir = frappe.get_site_path("private", "files")
+			file_path = frappe.get_site_path(self.policy_file.lstrip("/"))
+		elif self.policy_file.startswith("/files/"):
+			files_dir = frappe.get_site_path("public", "files")
+			file_path = frappe.get_site_path("public", self.policy_file.lstrip("/"))
+
+		if file_path:
+			# Only accept paths that stay inside the files folder (no "..", no symlink escape);
+			# anything else goes through the File document lookup below
+			file_path = os.path.realpath(file_path)
+			if file_path.startswith(os.path.join(os.path.realpath(files_dir), "")):
+				try:
+					os.stat(file_path)
+					return file_path
+				except OSError:
+					pass
+
+		# Fall back to the File document's own path resolution
 		try:
 			file_doc = frappe.get_doc("File", {"file_url": self.policy_file})
 			return file_doc.get_full_path()
@@ -465,8 +500,6 @@ class PolicyDocument(Document):
 		"""Check if document has been stuck in processing for too long"""
 		if self.status == "Processing" and self.modified:
 			# Use Frappe's time utilities for proper date handling
-			from frappe.utils import now_datetime, time_diff
-
 			# time_diff returns difference in seconds, convert to minutes
 			seconds_elapsed = time_diff(now_datetime(), self.modified).total_seconds()
 			minutes_elapsed = int(seconds_elapsed / 60)
@@ -497,7 +530,8 @@ def check_api_key_status():
 @frappe.whitelist()
 def test_claude_api_health():
 	"""Test Claude API connectivity with a simple health check"""
-	return APIHealthService.test_claude_api_health()
+	# The Test API button must reflect the API right now, not a recent cached result
+	return APIHealthService.test_claude_api_health(use_cache=False)
 
 
 @frappe.whitelist()
@@ -597,3 +631,96 @@ def process_policy_background(doc_name):
 				"Policy OCR Status Update Error",
 			)
 			# Don't re-raise to avoid recursive errors
+
+
+@frappe.whitelist()
+def process_policies_bulk(doc_names):
+	"""
+	Queue several Policy Documents as one background work item
+
+	All documents are marked Processing up front and extracted back to back by a
+	single job, which reuses the worker's settings, prompt memo and API connection.
+	"""
+	doc_names = frappe.parse_json(doc_names)
+	if not isinstance(doc_names, list) or not doc_names:
+		frappe.throw("Invalid input: doc_names must be a non-empty list")
+
+	for doc_name in doc_names:
+		doc = frappe.get_doc("Policy Document", doc_name)
+		if not doc.policy_file:
+			frappe.throw(f"Invalid input: no file attached to {doc_name}")
+		if not doc.policy_type:
+			frappe.throw(f"Invalid input: policy type is required for processing {doc_name}")
+		doc._mark_processing()
+
+	settings = CommonService.get_policy_reader_settings()
+	frappe.enqueue(
+		method="policy_reader.policy_reader.doctype.policy_document.policy_document.process_policies_background",
+		queue=settings.queue_type or "short",
+		timeout=(settings.timeout or 180) * len(doc_names),
+		is_async=True,
+		job_name=f"policy_reader_bulk_{int(time.time())}",
+		doc_names=doc_names,
+	)
+
+	return {
+		"success": True,
+		"message": f"Processing of {len(doc_names)} policy documents started in background.",
+		"status": "Processing",
+	}
+
+
+def process_policies_background(doc_names):
+	"""
+	Background job for a bulk work item; failures are handled per document
+
+	The Claude requests of the batch are dispatched concurrently, then each document
+	is updated and notified in turn.
+	"""
+	docs = []
+	for doc_name in doc_names:
+		try:
+			doc = frappe.get_doc("Policy Document", doc_name)
+		except Exception:
+			# The single-document job owns failure handling for unloadable documents
+			process_policy_background(doc_name)
+			continue
+
+		try:
+			frappe.set_user(doc.owner)
+			if not doc._validate_processing_prerequisites():
+				frappe.throw("Processing prerequisites not met")
+			docs.append((doc, doc.get_full_file_path()))
+		except Exception as e:
+			CommonService.log_processing_error("processing policy document", e, doc.name)
+			doc._handle_processing_error(e)
+
+	if not docs:
+		return
+
+	try:
+		settings = CommonService.get_policy_reader_settings()
+		api_key = CommonService.get_api_key(settings)
+		results = ClaudeVisionService.process_pdfs(
+			[(file_path, doc.policy_type) for doc, file_path in docs], api_key, settings
+		)
+	except Exception as e:
+		# Every document was already marked Processing; fail them all rather than
+		# leaving the batch for the stuck-document monitor
+		for doc, _ in docs:
+			try:
+				frappe.set_user(doc.owner)
+				CommonService.log_processing_error("processing policy document", e, doc.name)
+				doc._handle_processing_error(e)
+			except Exception:
+				frappe.log_error(frappe.get_traceback(), f"Policy processing failure handling failed for {doc.name}")
+		return
+
+	for (doc, _), (result, processing_time) in zip(docs, results):
+		try:
+			frappe.set_user(doc.owner)
+			doc._update_document_status(result, processing_time)
+			doc._notify_processing_completion(result, processing_time)
+		except Exception as e:
+			CommonService.log_processing_error("processing policy document", e, doc.name)
+			doc._handle_processing_error(e)
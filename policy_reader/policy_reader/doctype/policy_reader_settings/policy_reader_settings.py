@@ -3,14 +3,49 @@
 
 import json
 import os
+import re
 import time
 
 import frappe
 from frappe.model.document import Document
 from frappe.utils import cstr, now
 
+from policy_reader.policy_reader.services.api_health_service import HEALTH_CACHE_KEY
 from policy_reader.policy_reader.services.common_service import CommonService
 from policy_reader.policy_reader.services.prompt_service import PromptService
+from policy_reader.policy_reader.services.saiba_sync_service import SAIBA_TOKEN_CACHE_KEY
+
+# Redis key for each policy type's parsed field mapping
+FIELD_MAPPING_CACHE_KEY = "field_mapping_{}"
+
+# policy type -> Single field holding its alias→canonical mapping JSON
+_MAPPING_CONTAINERS = {"motor": "motor_policy_fields", "health": "health_policy_fields"}
+
+# Per-process copy of each (site, policy type)'s field mapping, tagged with the
+# settings `modified` timestamp it was read under so a saved change is picked up
+_field_mapping_memo = {}
+
+# Per-process (mapping, items tuple) per (site, policy type) for get_cached_field_mapping_items
+_field_mapping_items_memo = {}
+
+# Per-process default alias→canonical mapping per policy type, built on first use
+_default_field_mappings = {}
+
+# Serialized form of each default mapping; the alias tables are static code, so
+# this only changes on deploy and needs no invalidation
+_default_field_mapping_json = {}
+
+
+def dump_field_mapping(mapping):
+	"""Compact JSON for a flat alias→fieldname mapping, the stored form compared on refresh"""
+	return json.dumps(mapping, separators=(",", ":"), ensure_ascii=False)
+
+
+def clear_field_mapping_cache():
+	"""Drop the request's settings memo and the Redis field mappings after the Single is written"""
+	frappe.local.policy_reader_settings = None
+	for policy_type in ("motor", "health"):
+		frappe.cache().delete_value(FIELD_MAPPING_CACHE_KEY.format(policy_type))
 
 
 class PolicyReaderSettings(Document):
@@ -19,6 +54,12 @@ class PolicyReaderSettings(Document):
 		self.validate_api_key()
 		self.validate_numeric_fields()
 
+	def on_update(self):
+		"""Drop the settings memo, cached field mappings, API health and SAIBA token so later reads see the saved values"""
+		clear_field_mapping_cache()
+		frappe.cache().delete_value(HEALTH_CACHE_KEY)
+		frappe.cache().delete_value(SAIBA_TOKEN_CACHE_KEY)
+
 	def validate_api_key(self):
 		"""Validate Anthropic API key format"""
 		if self.anthropic_api_key:
@@ -85,15 +126,25 @@ class PolicyReaderSettings(Document):
 			frappe.logger().info(f"Built health mapping: {len(health_mapping)} fields")
 			frappe.logger().info(f"Sample health mapping: {dict(list(health_mapping.items())[:5])}")
 
-			# Update cached mappings
-			self.motor_policy_fields = frappe.as_json(motor_mapping)
-			self.health_policy_fields = frappe.as_json(health_mapping)
-			self.last_field_sync = now()
-
-			# Save the document
-			self.save()
-
-			frappe.logger().info("Field mappings saved to database")
+			motor_json = self.build_default_field_mapping_json("motor")
+			health_json = self.build_default_field_mapping_json("health")
+
+			# Only write the Single when a mapping actually changed; an identical
+			# save would just bump `modified` and invalidate every worker's memo
+			if motor_json != self.motor_policy_fields or health_json != self.health_policy_fields:
+				# One multi-column write instead of a full save(); it still bumps
+				# `modified`, which the per-worker memos key on
+				self.db_set(
+					{
+						"motor_policy_fields": motor_json,
+						"health_policy_fields": health_json,
+						"last_field_sync": now(),
+					}
+				)
+				clear_field_mapping_cache()
+				frappe.logger().info("Field mappings saved to database")
+			else:
+				frappe.logger().info("Field mappings unchanged; skipped saving")
 
 			frappe.msgprint(
 				f"Field mappings refreshed successfully (DocType-independent). Motor: {len(motor_mapping)} fields, Health: {len(health_mapping)} fields.",
@@ -111,8 +162,17 @@ class PolicyReaderSettings(Document):
 			frappe.throw("Unexpected error occurred while refreshing field mappings. Please contact support.")
 
 	def build_default_field_mapping(self, policy_type):
-		"""Build a default mapping from known aliases to canonical fieldnames without DocType dependency"""
+		"""
+		Build a default mapping from known aliases to canonical fieldnames without DocType dependency.
+
+		The alias tables are constant, so each policy type's mapping is built once per
+		process and the same dict is returned afterwards; callers must not mutate it.
+		"""
 		policy_type_lower = (policy_type or "").lower()
+		mapping = _default_field_mappings.get(policy_type_lower)
+		if mapping is not None:
+			return mapping
+
 		mapping = {}
 
 		# Define canonical fieldnames and their aliases per policy type
@@ -803,8 +863,18 @@ class PolicyReaderSettings(Document):
 			for alias in aliases:
 				mapping[alias] = canonical_field
 
+		_default_field_mappings[policy_type_lower] = mapping
 		return mapping
 
+	def build_default_field_mapping_json(self, policy_type):
+		"""Stored (compact JSON) form of build_default_field_mapping, serialized once per process"""
+		policy_type_lower = (policy_type or "").lower()
+		mapping_json = _default_field_mapping_json.get(policy_type_lower)
+		if mapping_json is None:
+			mapping_json = dump_field_mapping(self.build_default_field_mapping(policy_type_lower))
+			_default_field_mapping_json[policy_type_lower] = mapping_json
+		return mapping_json
+
 	def build_field_mapping_from_doctype(self, doctype_name):
 		"""Deprecated: Build field mapping from DocType definition.
 		Now delegates to DocType-independent default mapping for compatibility."""
@@ -819,32 +889,43 @@ class PolicyReaderSettings(Document):
 
 	def get_cached_field_mapping(self, policy_type):
 		"""Get cached field mapping for policy type with Frappe caching"""
-		cache_key = f"field_mapping_{policy_type.lower()}"
-
-		# Try to get from Frappe cache first
-		cached_mapping = frappe.cache().get_value(cache_key)
-		if cached_mapping:
-			frappe.logger().info(f"Field mapping cache hit for {policy_type}")
+		ptype = policy_type.lower()
+		cache_key = FIELD_MAPPING_CACHE_KEY.format(ptype)
+		version = cstr(self.modified)
+		memo_key = (frappe.local.site, ptype)
+
+		# Serve from this worker's memo while the settings are unchanged
+		memo = _field_mapping_memo.get(memo_key)
+		if memo and memo[0] == version:
+			return memo[1]
+
+		# Then try the Frappe cache. It holds (modified, mapping) so a hit needs no JSON
+		# parse; an entry written under other settings (e.g. refilled by a reader that
+		# still saw the previous row while a save was committing) counts as a miss
+		cached = frappe.cache().get_value(cache_key)
+		if isinstance(cached, (list, tuple)) and len(cached) == 2 and cached[0] == version:
+			cached_mapping = cached[1]
+			frappe.logger().info("Field mapping cache hit for %s", policy_type)
+			_field_mapping_memo[memo_key] = (version, cached_mapping)
 			return cached_mapping
 
 		try:
-			frappe.logger().info(f"Getting cached field mapping for {policy_type}")
+			frappe.logger().info("Getting cached field mapping for %s", policy_type)
 			mapping = {}
 
-			if policy_type.lower() == "motor":
-				frappe.logger().info(f"Motor policy fields exist: {bool(self.motor_policy_fields)}")
-				if self.motor_policy_fields:
-					mapping = frappe.parse_json(self.motor_policy_fields)
-					frappe.logger().info(f"Motor mapping loaded: {len(mapping)} entries")
-			elif policy_type.lower() == "health":
-				frappe.logger().info(f"Health policy fields exist: {bool(self.health_policy_fields)}")
-				if self.health_policy_fields:
-					mapping = frappe.parse_json(self.health_policy_fields)
-					frappe.logger().info(f"Health mapping loaded: {len(mapping)} entries")
+			container = _MAPPING_CONTAINERS.get(ptype)
+			if container:
+				stored = self.get(container)
+				label = ptype.capitalize()
+				frappe.logger().info("%s policy fields exist: %s", label, bool(stored))
+				if stored:
+					mapping = frappe.parse_json(stored)
+					frappe.logger().info("%s mapping loaded: %d entries", label, len(mapping))
 
 			# Cache for 1 hour
-			frappe.cache().set_value(cache_key, mapping, expires_in_sec=3600)
-			frappe.logger().info(f"Field mapping cached for {policy_type}")
+			frappe.cache().set_value(cache_key, (version, mapping), expires_in_sec=3600)
+			_field_mapping_memo[memo_key] = (version, mapping)
+			frappe.logger().info("Field mapping cached for %s", policy_type)
 			return mapping
 
 		except Exception as e:
@@ -852,9 +933,26 @@ class PolicyReaderSettings(Document):
 				f"Unexpected error while getting cached field mapping for {policy_type}: {str(e)}",
 				frappe.get_traceback(),
 			)
-			frappe.logger().error(f"Error getting cached field mapping for {policy_type}: {str(e)}")
+			frappe.logger().error("Error getting cached field mapping for %s: %s", policy_type, e)
 			return {}
 
+	def get_cached_field_mapping_items(self, policy_type):
+		"""
+		Return get_cached_field_mapping's (alias, canonical) pairs as a tuple.
+
+		Prompt builders iterate all pairs and use them as a memo key, so the tuple is
+		built once per cached mapping object instead of on every prompt.
+		"""
+		mapping = self.get_cached_field_mapping(policy_type) or {}
+		memo_key = (frappe.local.site, policy_type.lower())
+		memo = _field_mapping_items_memo.get(memo_key)
+		if memo and memo[0] is mapping:
+			return memo[1]
+
+		items = tuple(mapping.items())
+		_field_mapping_items_memo[memo_key] = (mapping, items)
+		return items
+
 	def build_dynamic_extraction_prompt(self, policy_type, extracted_text):
 		"""Build dynamic extraction prompt based on DocType fields"""
 		try:
@@ -1396,8 +1494,6 @@ Return data as valid JSON:"""
 			if not text:
 				return ""
 			value = cstr(text).strip().lower()
-			import re
-
 			value = re.sub(r"[^a-z0-9]+", " ", value)
 			value = " ".join(part for part in value.split() if part)
 			return value
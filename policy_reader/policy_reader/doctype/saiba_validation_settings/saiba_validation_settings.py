@@ -4,12 +4,25 @@
 import frappe
 from frappe.model.document import Document
 
+from policy_reader.policy_reader.services.saiba_sync_service import REQUIRED_FIELDS_CACHE_KEY
+from policy_reader.policy_reader.services.saiba_validation_service import (
+	VALIDATION_ENABLED_CACHE_KEY,
+	_load_rules,
+)
+
 
 class SAIBAValidationSettings(Document):
 	def validate(self):
 		"""Validate SAIBA Validation Settings"""
 		self.validate_rules()
 
+	def on_update(self):
+		"""Drop the cached flag, rules and required-field sets so the next check sees the saved settings"""
+		_load_rules.cache_clear()
+		frappe.cache().delete_value(VALIDATION_ENABLED_CACHE_KEY)
+		for policy_type in ("motor", "health"):
+			frappe.cache().delete_value(REQUIRED_FIELDS_CACHE_KEY.format(policy_type))
+
 	def validate_rules(self):
 		"""Ensure no duplicate rules exist"""
 		# Check for duplicate Motor rules
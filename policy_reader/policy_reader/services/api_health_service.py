@@ -2,34 +2,68 @@
 # For license information, please see license.txt
 
 import frappe
+import threading
 import time
 from policy_reader.policy_reader.services.common_service import CommonService
 
+# Optional dependency: resolved once at import time instead of on every health check
+try:
+    from anthropic import Anthropic
+except ImportError:
+    Anthropic = None
+
+# Successful health checks are reused for a short while instead of spending a
+# Claude request on every check; cleared when Policy Reader Settings is saved
+HEALTH_CACHE_KEY = "policy_reader:claude_api_health"
+HEALTH_CACHE_TTL = 60
+
+# Process-wide client reused across health checks so its connection pool stays
+# warm; rebuilt only when the configured API key changes
+_client = None
+_client_api_key = None
+_client_lock = threading.Lock()
+
+
+def _get_client(api_key):
+    """Return the shared Anthropic client for api_key"""
+    global _client, _client_api_key
+    with _client_lock:
+        if _client is None or _client_api_key != api_key:
+            _client = Anthropic(api_key=api_key)
+            _client_api_key = api_key
+        return _client
+
 
 class APIHealthService:
     """Service for checking API health and connectivity"""
     
     @staticmethod
-    def test_claude_api_health():
+    def test_claude_api_health(use_cache=True):
         """
         Test Claude API connectivity using Anthropic Python SDK
+
+        A successful result is cached for HEALTH_CACHE_TTL seconds and served
+        with "cached": True; pass use_cache=False to force a live request.
         """
+        if use_cache:
+            cached = frappe.cache().get_value(HEALTH_CACHE_KEY)
+            if cached:
+                return {**cached, "cached": True}
+        
         try:
             # Get API key using common service
             settings = CommonService.get_policy_reader_settings()
             api_key = CommonService.get_api_key(settings)
             
-            # Import Anthropic SDK
-            try:
-                from anthropic import Anthropic
-            except ImportError:
+            # Anthropic SDK is optional
+            if Anthropic is None:
                 return {
                     "success": False,
                     "error": "Anthropic Python SDK not installed. Please install with: pip install anthropic"
                 }
             
-            # Initialize Anthropic client
-            client = Anthropic(api_key=api_key)
+            # Reuse the process-wide Anthropic client (keep-alive connection)
+            client = _get_client(api_key)
             
             # Simple health check with minimal token usage
             start_time = time.time()
@@ -52,7 +86,7 @@ class APIHealthService:
                 if hasattr(response, 'usage') and response.usage:
                     tokens_used = (response.usage.input_tokens or 0) + (response.usage.output_tokens or 0)
                 
-                return {
+                result = {
                     "success": True,
                     "response_time": response_time,
                     "message": "API is healthy and responsive",
@@ -60,6 +94,8 @@ class APIHealthService:
                     # "model": getattr(settings, 'claude_model', 'claude-sonnet-4-20241022')
                     "model": getattr(settings, 'claude_model', 'claude-sonnet-4-6')
                 }
+                frappe.cache().set_value(HEALTH_CACHE_KEY, result, expires_in_sec=HEALTH_CACHE_TTL)
+                return result
                 
             except Exception as api_error:
                 return APIHealthService._handle_api_error(api_error)
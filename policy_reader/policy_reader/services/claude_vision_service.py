@@ -2,13 +2,107 @@
 # For license information, please see license.txt
 
 import base64
+import functools
+import json
+import logging
+import mmap
 import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 import frappe
 import requests
+from requests.adapters import HTTPAdapter
 
 from policy_reader.policy_reader.services.common_service import CommonService
 
+# Optional faster JSON decoder for API responses; stdlib json is used without it
+try:
+	import orjson
+except ImportError:
+	orjson = None
+
+CLAUDE_MESSAGES_URL = "https://api.anthropic.com/v1/messages"
+_BASE_HEADERS = {"Content-Type": "application/json", "anthropic-version": "2023-06-01"}
+
+# Per-process limits for outgoing Claude requests: at most this many in flight,
+# and request starts spaced at least this far apart (seconds)
+MAX_INFLIGHT_REQUESTS = 4
+MIN_REQUEST_INTERVAL = 0.25
+
+# Transient responses retried with exponential backoff (529: Anthropic overloaded)
+RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504, 529})
+MAX_REQUEST_ATTEMPTS = 3
+RETRY_MIN_WAIT = 1.0
+RETRY_MAX_WAIT = 16.0
+
+# Upper bound on a Claude response body; replies are capped by max_tokens, so
+# anything larger is treated as a broken response rather than buffered
+MAX_RESPONSE_BYTES = 16 * 1024 * 1024
+
+# Stands in for the base64 PDF while the payload is serialized; the encoded bytes
+# are spliced into the request body afterwards
+_PDF_DATA_PLACEHOLDER = "__policy_reader_pdf_data__"
+
+_inflight_requests = threading.BoundedSemaphore(MAX_INFLIGHT_REQUESTS)
+_request_pacing_lock = threading.Lock()
+_next_request_at = 0.0
+
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def _get_session():
+	"""Process-wide keep-alive session so consecutive requests reuse the TLS connection"""
+	global _session
+	if _session is None:
+		with _session_lock:
+			if _session is None:
+				session = requests.Session()
+				session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=MAX_INFLIGHT_REQUESTS))
+				_session = session
+	return _session
+
+
+def _load_response_json(content):
+	"""Decode a JSON response body straight from its bytes, without building a str first"""
+	if orjson is not None:
+		return orjson.loads(content)
+	return json.loads(content)
+
+
+def _read_capped_body(response):
+	"""Download a streamed response body and return its bytes, refusing anything over MAX_RESPONSE_BYTES"""
+	content_length = response.headers.get("content-length")
+	if content_length and content_length.isdigit() and int(content_length) > MAX_RESPONSE_BYTES:
+		response.close()
+		raise ValueError(f"Claude API response too large ({content_length} bytes)")
+
+	chunks = []
+	received = 0
+	for chunk in response.iter_content(chunk_size=64 * 1024):
+		received += len(chunk)
+		if received > MAX_RESPONSE_BYTES:
+			response.close()
+			raise ValueError(f"Claude API response exceeded {MAX_RESPONSE_BYTES} bytes")
+		chunks.append(chunk)
+
+	return b"".join(chunks)
+
+
+def _wait_for_request_slot():
+	"""Block until the next request may start under MIN_REQUEST_INTERVAL"""
+	global _next_request_at
+	with _request_pacing_lock:
+		now = time.monotonic()
+		wait = _next_request_at - now
+		_next_request_at = max(now, _next_request_at) + MIN_REQUEST_INTERVAL
+	if wait > 0:
+		time.sleep(wait)
+
 
 class ClaudeVisionService:
 	"""Service for handling Claude Vision API interactions"""
@@ -19,34 +113,91 @@ class ClaudeVisionService:
 		Process PDF directly with Claude API using native PDF support
 		"""
 		try:
-			# Read and encode PDF file directly
-			pdf_data = ClaudeVisionService._encode_pdf_file(file_path)
-
-			# Get extraction prompt from settings
-			prompt_text = ClaudeVisionService._get_vision_extraction_prompt(settings, policy_type)
-
-			# Prepare Claude API request with direct PDF support
-			headers = ClaudeVisionService._prepare_headers(api_key)
-
-			content = ClaudeVisionService._build_content_array(pdf_data, prompt_text)
-			payload = ClaudeVisionService._build_payload(settings, content)
+			headers, body = ClaudeVisionService._prepare_request(file_path, api_key, settings, policy_type)
 
 			# Make API call
-			response = ClaudeVisionService._make_api_call(headers, payload, settings)
+			response, content = ClaudeVisionService._make_api_call(headers, body, settings)
 
 			# Process response
-			return ClaudeVisionService._process_api_response(response)
+			return ClaudeVisionService._process_api_response(response, content)
 
 		except Exception as e:
 			frappe.log_error(f"Claude vision processing error: {str(e)}", frappe.get_traceback())
 			return {"success": False, "error": f"Claude vision processing failed: {str(e)}"}
 
+	@staticmethod
+	def process_pdfs(jobs, api_key, settings):
+		"""
+		Process several PDFs, overlapping their Claude API round-trips
+
+		`jobs` is a list of (file_path, policy_type). Requests are built and responses
+		handled on the calling thread (they need the Frappe context); only the HTTP
+		calls run on a thread pool, still bounded by MAX_INFLIGHT_REQUESTS.
+		Returns a list of (result, processing_time) aligned with `jobs`.
+		"""
+
+		def timed_call(headers, body):
+			start_time = time.time()
+			try:
+				return ClaudeVisionService._make_api_call(headers, body, settings), time.time() - start_time
+			except Exception as e:
+				return e, time.time() - start_time
+
+		prepared = []
+		for file_path, policy_type in jobs:
+			try:
+				prepared.append(ClaudeVisionService._prepare_request(file_path, api_key, settings, policy_type))
+			except Exception as e:
+				prepared.append(e)
+
+		with ThreadPoolExecutor(max_workers=max(1, min(MAX_INFLIGHT_REQUESTS, len(jobs)))) as executor:
+			futures = [
+				None if isinstance(request, Exception) else executor.submit(timed_call, *request)
+				for request in prepared
+			]
+
+		results = []
+		for request, future in zip(prepared, futures):
+			outcome, elapsed = (request, 0) if future is None else future.result()
+			try:
+				if isinstance(outcome, Exception):
+					raise outcome
+				result = ClaudeVisionService._process_api_response(*outcome)
+			except Exception as e:
+				frappe.log_error(f"Claude vision processing error: {str(e)}", frappe.get_traceback())
+				result = {"success": False, "error": f"Claude vision processing failed: {str(e)}"}
+			results.append((result, round(elapsed, 2)))
+		return results
+
+	@staticmethod
+	def _prepare_request(file_path, api_key, settings, policy_type):
+		"""Build the (headers, body) for one PDF extraction request"""
+		# Read and encode PDF file directly
+		pdf_data = ClaudeVisionService._encode_pdf_file(file_path)
+
+		# Get extraction prompt from settings
+		prompt_text = ClaudeVisionService._get_vision_extraction_prompt(settings, policy_type)
+
+		# Prepare Claude API request with direct PDF support
+		headers = ClaudeVisionService._prepare_headers(api_key)
+
+		content = ClaudeVisionService._build_content_array(_PDF_DATA_PLACEHOLDER, prompt_text)
+		payload = ClaudeVisionService._build_payload(settings, content)
+		return headers, ClaudeVisionService._serialize_payload(payload, pdf_data)
+
 	@staticmethod
 	def _encode_pdf_file(file_path):
-		"""Encode PDF file to base64"""
+		"""Encode PDF file to base64 (ASCII bytes, ready to splice into the request body)"""
 		CommonService.validate_file_access(file_path)
 		with open(file_path, "rb") as pdf_file:
-			return base64.standard_b64encode(pdf_file.read()).decode("utf-8")
+			if not os.fstat(pdf_file.fileno()).st_size:
+				return b""
+			# Encode straight from the page cache instead of copying the file into a bytes object
+			with mmap.mmap(pdf_file.fileno(), 0, access=mmap.ACCESS_READ) as pdf_map:
+				# The file is read once front to back; let the kernel read ahead aggressively
+				if hasattr(mmap, "MADV_SEQUENTIAL"):
+					pdf_map.madvise(mmap.MADV_SEQUENTIAL)
+				return base64.standard_b64encode(pdf_map)
 
 	@staticmethod
 	def _get_vision_extraction_prompt(settings, policy_type):
@@ -54,15 +205,27 @@ class ClaudeVisionService:
 		try:
 			# Get field mapping from settings
 			policy_reader_settings = CommonService.get_policy_reader_settings()
-			mapping = policy_reader_settings.get_cached_field_mapping(policy_type.lower()) or {}
+			mapping_items = policy_reader_settings.get_cached_field_mapping_items(policy_type.lower())
 
-			# Get canonical fields (fields that map to themselves)
-			canonical_fields = [k for k, v in mapping.items() if k == v]
-			canonical_fields = sorted(set(canonical_fields))
-			if canonical_fields:
-				fields_list = "\n".join([f"- {field}" for field in canonical_fields])
+			# The prompt only depends on the policy type and the mapping, so it is built
+			# once per distinct mapping and served from the memo afterwards
+			return ClaudeVisionService._build_vision_extraction_prompt(policy_type.lower(), mapping_items)
+
+		except Exception as e:
+			frappe.log_error(f"Error building vision prompt: {str(e)}", frappe.get_traceback())
+			return f"Extract key information from this {policy_type.lower()} insurance policy as JSON."
+
+	@staticmethod
+	@functools.lru_cache(maxsize=16)
+	def _build_vision_extraction_prompt(policy_type, mapping_items):
+		"""Build the vision prompt for a lowercase policy type and mapping items (memoized)"""
+		# Get canonical fields (fields that map to themselves)
+		canonical_fields = [k for k, v in mapping_items if k == v]
+		canonical_fields = sorted(set(canonical_fields))
+		if canonical_fields:
+			fields_list = "\n".join([f"- {field}" for field in canonical_fields])
 
-				prompt = f"""Analyze this {policy_type.lower()} insurance policy PDF and extract the following information as a flat JSON object:
+			prompt = f"""Analyze this {policy_type.lower()} insurance policy PDF and extract the following information as a flat JSON object:
 
 Required fields to extract:
 {fields_list}
@@ -327,9 +490,9 @@ If value cannot be converted to pure number → return null
 
 RESPOND WITH VALID FLAT JSON ONLY - NO EXPLANATIONS, NO MARKDOWN, NO CODE BLOCKS."""
 
-				# Add health-specific insured persons extraction instructions
-				if policy_type.lower() == "health":
-					prompt += """
+			# Add health-specific insured persons extraction instructions
+			if policy_type.lower() == "health":
+				prompt += """
 
 INSURED PERSONS TABLE EXTRACTION:
 This policy may contain a table listing multiple insured members/dependents.
@@ -349,19 +512,15 @@ IMPORTANT:
 - Relation: Use "Self", "Spouse", "Wife", "Husband", "Son", "Daughter", "Father", "Mother", or "Other"
 """
 
-				return prompt
-			else:
-				# Fallback prompt if no mapping available
-				return f"Extract key information from this {policy_type.lower()} insurance policy as JSON."
-
-		except Exception as e:
-			frappe.log_error(f"Error building vision prompt: {str(e)}", frappe.get_traceback())
+			return prompt
+		else:
+			# Fallback prompt if no mapping available
 			return f"Extract key information from this {policy_type.lower()} insurance policy as JSON."
 
 	@staticmethod
 	def _prepare_headers(api_key):
 		"""Prepare headers for Claude API request"""
-		return {"Content-Type": "application/json", "X-API-Key": api_key, "anthropic-version": "2023-06-01"}
+		return {**_BASE_HEADERS, "X-API-Key": api_key}
 
 	@staticmethod
 	def _build_content_array(pdf_data, prompt_text):
@@ -385,34 +544,80 @@ IMPORTANT:
 		}
 
 	@staticmethod
-	def _make_api_call(headers, payload, settings):
-		"""Make API call to Claude"""
-		return requests.post(
-			"https://api.anthropic.com/v1/messages",
-			headers=headers,
-			json=payload,
-			timeout=settings.timeout or 180,
-		)
+	def _serialize_payload(payload, pdf_data):
+		"""
+		Serialize the payload to a JSON request body with the base64 PDF spliced in
+
+		Base64 needs no JSON escaping, so the encoded bytes go into the body as-is rather
+		than being decoded to str and re-scanned by json.dumps.
+		"""
+		prefix, suffix = json.dumps(payload).encode("utf-8").split(_PDF_DATA_PLACEHOLDER.encode("ascii"), 1)
+		return b"".join((prefix, pdf_data, suffix))
+
+	@staticmethod
+	def _make_api_call(headers, body, settings):
+		"""
+		Make API call to Claude, bounded by the per-process concurrency and pacing limits
+
+		Rate-limit/overload responses and dropped connections are retried with
+		exponential backoff (honouring Retry-After) before the last response is returned
+		as (response, body bytes).
+		"""
+		for attempt in range(MAX_REQUEST_ATTEMPTS):
+			last_attempt = attempt == MAX_REQUEST_ATTEMPTS - 1
+			try:
+				with _inflight_requests:
+					_wait_for_request_slot()
+					response = _get_session().post(
+						CLAUDE_MESSAGES_URL,
+						headers=headers,
+						data=body,
+						timeout=settings.timeout or 180,
+						stream=True,
+					)
+					content = _read_capped_body(response)
+			except requests.ConnectionError:
+				if last_attempt:
+					raise
+				response = None
+
+			if response is not None and (response.status_code not in RETRYABLE_STATUS_CODES or last_attempt):
+				return response, content
+
+			wait = min(RETRY_MAX_WAIT, RETRY_MIN_WAIT * 2**attempt)
+			retry_after = response.headers.get("retry-after") if response is not None else None
+			if retry_after and retry_after.isdigit():
+				wait = min(RETRY_MAX_WAIT, max(wait, float(retry_after)))
+			frappe.logger().warning(
+				"Claude API attempt %d/%d failed (%s); retrying in %.1fs",
+				attempt + 1,
+				MAX_REQUEST_ATTEMPTS,
+				response.status_code if response is not None else "connection error",
+				wait,
+			)
+			time.sleep(wait + random.uniform(0, 0.1))
 
 	@staticmethod
-	def _process_api_response(response):
-		"""Process Claude API response"""
+	def _process_api_response(response, content):
+		"""Process Claude API response given its already-downloaded body"""
 		if response.status_code == 200:
-			return ClaudeVisionService._handle_successful_response(response)
+			return ClaudeVisionService._handle_successful_response(content)
 		elif response.status_code == 429:
-			return ClaudeVisionService._handle_rate_limit_response(response)
+			return ClaudeVisionService._handle_rate_limit_response(content)
 		elif response.status_code == 401:
 			return ClaudeVisionService._handle_auth_error_response()
 		else:
-			return ClaudeVisionService._handle_error_response(response)
+			return ClaudeVisionService._handle_error_response(response, content)
 
 	@staticmethod
-	def _handle_successful_response(response):
+	def _handle_successful_response(content):
 		"""Handle successful API response"""
-		response_data = response.json()
+		response_data = _load_response_json(content)
+		logger = frappe.logger()
 
-		# Log the full response for debugging
-		frappe.logger().info(f"Claude API Response: {response_data}")
+		# Dump the full response only when debugging; it is large and formatting it is not free
+		if logger.isEnabledFor(logging.DEBUG):
+			logger.debug("Claude API Response: %s", response_data)
 
 		content = response_data.get("content", [{}])[0].get("text", "")
 
@@ -425,9 +630,7 @@ IMPORTANT:
 		output_tokens = usage.get("output_tokens", 0)
 		tokens_used = input_tokens + output_tokens
 
-		frappe.logger().info(
-			f"Token Usage - Input: {input_tokens}, Output: {output_tokens}, Total: {tokens_used}"
-		)
+		logger.info("Token Usage - Input: %s, Output: %s, Total: %s", input_tokens, output_tokens, tokens_used)
 
 		return {
 			"success": True,
@@ -438,10 +641,10 @@ IMPORTANT:
 		}
 
 	@staticmethod
-	def _handle_rate_limit_response(response):
+	def _handle_rate_limit_response(content):
 		"""Handle rate limit response"""
-		error_data = response.json() if response.text else {}
-		error_message = error_data.get("error", {}).get("message", response.text)
+		error_data = _load_response_json(content) if content else {}
+		error_message = error_data.get("error", {}).get("message", content.decode("utf-8", "replace"))
 		return {
 			"success": False,
 			"error": f"API Rate Limit or Insufficient Balance: {error_message}",
@@ -458,10 +661,10 @@ IMPORTANT:
 		}
 
 	@staticmethod
-	def _handle_error_response(response):
+	def _handle_error_response(response, content):
 		"""Handle general error response"""
-		error_data = response.json() if response.text else {}
-		error_message = error_data.get("error", {}).get("message", response.text[:200])
+		error_data = _load_response_json(content) if content else {}
+		error_message = error_data.get("error", {}).get("message", content[:200].decode("utf-8", "replace"))
 		return {
 			"success": False,
 			"error": f"Claude API error: HTTP {response.status_code} - {error_message}",
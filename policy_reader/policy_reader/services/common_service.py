@@ -5,17 +5,90 @@ import frappe
 import os
 import json
 import re
+import queue
+import threading
+import atexit
+import functools
+from logging.handlers import QueueHandler, QueueListener
 from frappe.utils import getdate, cstr, flt, cint
 
+# Optional faster JSON decoder; frappe.parse_json (stdlib json) is used without it
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Optional C ISO-8601 parser; frappe's dateutil-based parsers are used without it
+try:
+    import ciso8601
+except ImportError:
+    ciso8601 = None
+
+
+# Dedicated logger for the field-mapping loops; frappe's shared logger is left untouched
+FIELD_MAPPING_LOGGER = "policy_reader.field_mapping"
+
+# Per-process registry of field-mapping loggers whose handlers run behind a QueueListener
+_queue_listeners = {}
+_queue_listeners_lock = threading.Lock()
+
+
+def _stop_queue_listeners():
+    """Flush pending log records on interpreter shutdown"""
+    while _queue_listeners:
+        _name, listener = _queue_listeners.popitem()
+        listener.stop()
+
+
+atexit.register(_stop_queue_listeners)
+
 
 class CommonService:
     """Common service for shared functionality across the Policy Reader app"""
     
+    @staticmethod
+    def get_field_mapping_logger():
+        """
+        Get the dedicated field-mapping logger with its file I/O on a background thread.
+
+        The first call per logger per process moves the handlers frappe attached to a
+        QueueListener and leaves a QueueHandler in their place, so the mapping loops
+        only pay for a queue put. The logger does not propagate, so nothing reaches
+        frappe's shared logger.
+        """
+        logger = frappe.logger(FIELD_MAPPING_LOGGER)
+        if logger.name in _queue_listeners:
+            return logger
+        
+        with _queue_listeners_lock:
+            if logger.name not in _queue_listeners:
+                handlers = [h for h in logger.handlers if not isinstance(h, QueueHandler)]
+                log_queue = queue.SimpleQueue()
+                listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+                for handler in handlers:
+                    logger.removeHandler(handler)
+                logger.addHandler(QueueHandler(log_queue))
+                logger.propagate = False
+                listener.start()
+                _queue_listeners[logger.name] = listener
+        
+        return logger
+    
     @staticmethod
     def get_policy_reader_settings():
-        """Get Policy Reader Settings with fallback to defaults"""
+        """
+        Get Policy Reader Settings with fallback to defaults.
+
+        Memoized on frappe.local so the processing path loads the single once per
+        request/job; PolicyReaderSettings.on_update clears the memo.
+        """
+        settings = getattr(frappe.local, "policy_reader_settings", None)
+        if settings is not None:
+            return settings
+
         try:
             settings = frappe.get_single("Policy Reader Settings")
+            frappe.local.policy_reader_settings = settings
             return settings
         except frappe.DoesNotExistError:
             frappe.logger().warning("Policy Reader Settings not found")
@@ -56,11 +129,30 @@ class CommonService:
             default = {}
         
         try:
+            if orjson is not None and isinstance(json_string, (str, bytes)):
+                parsed = orjson.loads(json_string)
+                # Match frappe.parse_json, which returns dicts as frappe._dict
+                return frappe._dict(parsed) if isinstance(parsed, dict) else parsed
             return frappe.parse_json(json_string)
         except (ValueError, TypeError):
             frappe.logger().warning(f"Failed to parse JSON: {str(json_string)[:100]}...")
             return default
     
+    @staticmethod
+    def parse_iso_datetime(value):
+        """
+        Parse an ISO-8601 string with ciso8601 when installed.
+
+        Returns a datetime, or None when ciso8601 is unavailable or the value is not
+        ISO-8601 so the caller can fall back to getdate/get_datetime.
+        """
+        if ciso8601 is None or not isinstance(value, str):
+            return None
+        try:
+            return ciso8601.parse_datetime(value.strip())
+        except ValueError:
+            return None
+    
     @staticmethod
     def extract_json_from_text(text):
         """Extract JSON from text with multiple parsing strategies"""
@@ -118,20 +210,6 @@ class CommonService:
         
         return policy_type.lower()
     
-    @staticmethod
-    def validate_file_access(file_path):
-        """Validate that file is accessible"""
-        if not file_path:
-            frappe.throw("Invalid input: file path is required")
-        
-        if not os.path.exists(file_path):
-            frappe.throw("Invalid input: file does not exist")
-        
-        if not os.access(file_path, os.R_OK):
-            frappe.throw("Invalid input: file is not readable")
-        
-        return True
-    
     @staticmethod
     def log_processing_error(operation, error, context=None):
         """Standardized error logging for processing operations"""
@@ -165,6 +243,22 @@ class CommonService:
         
         return value.strip()
     
+    @staticmethod
+    @functools.lru_cache(maxsize=512)
+    def parse_select_options(options):
+        """
+        Split a Select field's options string, memoized per options string.
+
+        Returns (options_tuple, lowercase_map) where lowercase_map maps each
+        option's lowercase form to the first option with that form. Both are
+        shared between callers and must not be mutated.
+        """
+        options_list = tuple(opt.strip() for opt in (options or "").split("\n") if opt.strip())
+        lowercase_map = {}
+        for option in options_list:
+            lowercase_map.setdefault(option.lower(), option)
+        return options_list, lowercase_map
+    
     @staticmethod
     def safe_get_attribute(obj, attr, default=None):
         """Safely get attribute from object with fallback"""
@@ -1,10 +1,18 @@
 # Copyright (c) 2025, Clapgrow Software and contributors
 # For license information, please see license.txt
 
+import logging
+import re
+from datetime import datetime
+
 import frappe
+from frappe.utils import get_datetime, getdate
 
 from policy_reader.policy_reader.services.common_service import CommonService
 
+# DD/MM/YYYY as emitted by the extraction prompt
+_DMY_RE = re.compile(r"^\s*(\d{1,2})/(\d{1,2})/(\d{4})\s*$")
+
 
 class FieldMappingService:
 	"""Service for dynamic field mapping between extracted data and policy records"""
@@ -31,68 +39,82 @@ class FieldMappingService:
 		protected_count = 0
 		self._vehicle_info = {}
 
-		frappe.logger().info(f"=== FIELD MAPPING DEBUG ===")
-		frappe.logger().info(f"Parsed data keys: {list(parsed_data.keys())}")
-		frappe.logger().info(f"Field mapping keys: {list(field_mapping.keys())}")
-		frappe.logger().info(f"Policy record doctype: {policy_record.doctype}")
-		if protected_fields:
-			frappe.logger().info(f"Protected fields: {protected_fields}")
+		logger = CommonService.get_field_mapping_logger()
+		verbose = logger.isEnabledFor(logging.DEBUG)
+		if verbose:
+			logger.debug("=== FIELD MAPPING DEBUG ===")
+			logger.debug("Parsed data keys: %s", list(parsed_data))
+			logger.debug("Field mapping keys: %s", list(field_mapping))
+			logger.debug("Policy record doctype: %s", policy_record.doctype)
+			if protected_fields:
+				logger.debug("Protected fields: %s", protected_fields)
 
 		# Build normalized mapping for robust matching
 		normalized_mapping = self._build_normalized_mapping(field_mapping)
 
+		# Resolve DocType metadata once instead of once per field
+		meta = frappe.get_meta(policy_record.doctype)
+
+		# Converted values are collected and applied to the record in one update()
+		updates = {}
+
+		# Bind hot-loop lookups to locals
+		get_field = normalized_mapping.get
+		normalize = self._normalize_key
+		convert = self._convert_field_value
+		doctype = policy_record.doctype
+
 		# First pass: direct and normalized-key matching over parsed_data keys
 		for raw_key, raw_value in parsed_data.items():
-			if raw_value is None or str(raw_value).strip() == "":
+			if raw_value is None or (isinstance(raw_value, str) and not raw_value.strip()):
 				continue
 
-			# Try direct match
-			policy_field_name = normalized_mapping.get(raw_key)
-
-			# Try normalized key match
-			if not policy_field_name:
-				nk = self._normalize_key(raw_key)
-				policy_field_name = normalized_mapping.get(nk)
+			# Try direct match, then normalized key match
+			policy_field_name = get_field(raw_key) or get_field(normalize(raw_key))
 
 			if policy_field_name:
 				# Skip if this field is protected and already has a value
 				if protected_fields and policy_field_name in protected_fields:
-					current_value = getattr(policy_record, policy_field_name, None)
+					current_value = updates.get(policy_field_name) or getattr(
+						policy_record, policy_field_name, None
+					)
 					if current_value:
 						protected_count += 1
-						frappe.logger().info(
-							f"⊘ Skipping {policy_field_name} - already set from Policy Document (value: {current_value})"
+						logger.debug(
+							"⊘ Skipping %s - already set from Policy Document (value: %s)",
+							policy_field_name,
+							current_value,
 						)
 						continue
 
 				try:
-					converted_value = self._convert_field_value(
-						policy_field_name, raw_value, policy_record.doctype
-					)
+					converted_value = convert(policy_field_name, raw_value, doctype, meta=meta)
 					if converted_value is not None:
-						setattr(policy_record, policy_field_name, converted_value)
+						updates[policy_field_name] = converted_value
 						mapped_count += 1
-						frappe.logger().info(f"✓ Mapped {raw_key} -> {policy_field_name}: {converted_value}")
+						logger.debug("✓ Mapped %s -> %s: %s", raw_key, policy_field_name, converted_value)
 					else:
 						unmapped_fields.append(raw_key)
 				except Exception as e:
-					frappe.logger().error(f"✗ Error mapping {raw_key}: {str(e)}")
+					logger.error("✗ Error mapping %s: %s", raw_key, e)
 					unmapped_fields.append(raw_key)
 			else:
 				unmapped_fields.append(raw_key)
 				# Collect suggestions to guide alias additions
-				nk = self._normalize_key(raw_key)
-				cands = self._find_best_match(nk, list(normalized_mapping.keys()))
+				cands = self._find_best_match(normalize(raw_key), list(normalized_mapping))
 				if cands:
 					suggestions[raw_key] = cands
 
+		policy_record.update(updates)
+
 		# Log summary
-		frappe.logger().info(f"=== FIELD MAPPING SUMMARY ===")
-		frappe.logger().info(f"Total fields processed: {len(parsed_data)}")
-		frappe.logger().info(f"Successfully mapped: {mapped_count}")
-		frappe.logger().info(f"Protected fields skipped: {protected_count}")
-		frappe.logger().info(f"Unmapped fields: {len(unmapped_fields)}")
-		frappe.logger().info(f"Unmapped: {unmapped_fields}")
+		if verbose:
+			logger.debug("=== FIELD MAPPING SUMMARY ===")
+			logger.debug("Total fields processed: %d", len(parsed_data))
+			logger.debug("Successfully mapped: %d", mapped_count)
+			logger.debug("Protected fields skipped: %d", protected_count)
+			logger.debug("Unmapped fields: %d", len(unmapped_fields))
+			logger.debug("Unmapped: %s", unmapped_fields)
 		if hasattr(self, "_vehicle_info"):
 			policy_record.vehicle_info_text = ", ".join(f"{k}: {v}" for k, v in self._vehicle_info.items())
 		return {
@@ -127,11 +149,13 @@ class FieldMappingService:
 		normalized = normalized.replace("(", "").replace(")", "").replace("[", "").replace("]", "")
 		return normalized
 
-	def _convert_field_value(self, field_name, value, doctype):
+	def _convert_field_value(self, field_name, value, doctype, meta=None):
 		"""Convert field value based on Frappe field metadata"""
 		try:
 			# Get field metadata
-			field_meta = frappe.get_meta(doctype).get_field(field_name)
+			if meta is None:
+				meta = frappe.get_meta(doctype)
+			field_meta = meta.get_field(field_name)
 			if not field_meta:
 				return value
 
@@ -139,16 +163,24 @@ class FieldMappingService:
 				if not hasattr(self, "_vehicle_info"):
 					self._vehicle_info = {}
 
-				self._vehicle_info[field_name] = str(value).strip()
+				value = str(value).strip()
+				self._vehicle_info[field_name] = value
 				doctype_map = {"make": "SB Make", "model": "SB Model", "variant": "SB Variant"}
 
-				exists = frappe.db.exists(doctype_map[field_name], str(value).strip())
+				# Look up the value and, for model/variant, the "NA" fallback in one query
+				candidates = [value] if field_name == "make" else [value, "NA"]
+				found = {
+					name.casefold()
+					for name in frappe.get_all(
+						doctype_map[field_name], filters={"name": ["in", candidates]}, pluck="name"
+					)
+				}
 
-				if exists:
-					return str(value).strip()
+				if value.casefold() in found:
+					return value
 
 				if field_name in ["model", "variant"]:
-					if frappe.db.exists(doctype_map[field_name], "NA"):
+					if "na" in found:
 						return "NA"
 
 				return None
@@ -179,10 +211,6 @@ class FieldMappingService:
 			return None
 
 		try:
-			from datetime import datetime
-
-			from frappe.utils import getdate
-
 			# Handle DD/MM/YYYY format (common in Indian documents)
 			if isinstance(value, str) and "/" in value:
 				# Try to parse DD/MM/YYYY format
@@ -208,6 +236,11 @@ class FieldMappingService:
 				except (ValueError, IndexError):
 					pass
 
+			# ISO-8601 via the C parser when available
+			parsed = CommonService.parse_iso_datetime(value)
+			if parsed is not None:
+				return parsed.date()
+
 			# Fallback to Frappe's getdate
 			return getdate(value)
 		except (ValueError, TypeError, AttributeError):
@@ -219,22 +252,19 @@ class FieldMappingService:
 			return None
 
 		try:
-			from datetime import datetime
-
-			from frappe.utils import get_datetime
-
 			# Handle DD/MM/YYYY format (common in Indian documents)
-			if isinstance(value, str) and "/" in value:
-				# Try to parse DD/MM/YYYY format
-				try:
-					parts = value.split("/")
-					if len(parts) == 3:
-						day, month, year = parts
-						# Convert DD/MM/YYYY to YYYY-MM-DD HH:MM:SS
-						datetime_str = f"{year}-{month.zfill(2)}-{day.zfill(2)} 00:00:00"
-						return get_datetime(datetime_str)
-				except (ValueError, IndexError):
-					pass
+			if isinstance(value, str):
+				match = _DMY_RE.match(value)
+				if match:
+					try:
+						return datetime(int(match[3]), int(match[2]), int(match[1]))
+					except ValueError:
+						pass
+
+			# ISO-8601 via the C parser when available
+			parsed = CommonService.parse_iso_datetime(value)
+			if parsed is not None:
+				return parsed
 
 			# Fallback to Frappe's get_datetime
 			return get_datetime(value)
@@ -284,20 +314,21 @@ class FieldMappingService:
 			return None
 
 		value_str = str(value).strip()
-		options_list = [opt.strip() for opt in options.split("\n") if opt.strip()]
+		options_list, options_by_lower = CommonService.parse_select_options(options)
 
 		# Try exact match first
 		if value_str in options_list:
 			return value_str
 
 		# Try case-insensitive match
-		for option in options_list:
-			if option.lower() == value_str.lower():
-				return option
+		value_lower = value_str.lower()
+		option = options_by_lower.get(value_lower)
+		if option:
+			return option
 
 		# Try partial match
-		for option in options_list:
-			if value_str.lower() in option.lower() or option.lower() in value_str.lower():
+		for option_lower, option in options_by_lower.items():
+			if value_lower in option_lower or option_lower in value_lower:
 				return option
 
 		# No match found - check for field-specific defaults
@@ -1,13 +1,75 @@
-import ast
-import json
+import datetime
+import logging
+import re
+from difflib import get_close_matches
 
 import frappe
-from frappe import _
-from frappe.utils import cint, cstr, flt, getdate
+from frappe.utils import cint, cstr, flt, get_datetime, getdate
 
 from policy_reader.policy_reader.services.common_service import CommonService
 from policy_reader.policy_reader.services.field_mapping_service import FieldMappingService
 
+# DD/MM/YYYY as emitted by the extraction prompt
+_DMY_RE = re.compile(r"^\s*(\d{1,2})/(\d{1,2})/(\d{4})\s*$")
+
+# Runs of anything other than lowercase letters and digits, collapsed in _normalize_key
+_NON_ALNUM_RE = re.compile(r"[^a-z0-9]+")
+
+# policy type -> (policy DocType, back-link field on Policy Document)
+_POLICY_DISPATCH = {
+	"motor": ("Motor Policy", "motor_policy"),
+	"health": ("Health Policy", "health_policy"),
+}
+
+# Placeholder strings the extraction uses for missing values (compared upper-cased)
+_NA_VALUES = frozenset({"NA", "N/A", "NULL", "NONE", ""})
+
+# Attachment fields copied from Policy Document onto the created policy record
+_DOCUMENT_FIELDS = (
+	"final_quote_renewal_notice",
+	"quote_comparison",
+	"mandate_doc",
+	"kyc_doc",
+	"proposal_form",
+	"portability_form",
+	"policy_copy_doc",
+	"rc_copy",
+	"passport_copy",
+	"payment_details_doc",
+)
+
+# Policy Document field -> policy record field for the checklist section
+_CHECKLIST_FIELD_PAIRS = (
+	("checklist_department", "department"),
+	("checklist_policy_type", "policy_type"),
+	("checklist_coverage_type", "coverage_type"),
+	("checklist_old_control_number", "old_control_number"),
+	("checklist_branch_code", "branch_code"),
+	("checklist_biz_type", "biz_type"),
+	("checklist_customer_vertical", "customer_vertical"),
+	("checklist_rm_code", "rm_code"),
+	("checklist_csc_code", "csc_code"),
+	("checklist_tc_code", "tc_code"),
+	("checklist_ref_code", "ref_code"),
+	("checklist_customer_pan", "customer_pan"),
+	("checklist_customer_gst", "customer_gst"),
+	("checklist_category", "category"),
+	("checklist_portability", "campaign_name"),
+	("rm", "rm"),
+	("rm_code", "rm_rm_code"),
+	("csc", "csc"),
+	("csc_code", "csc_csc_code"),
+	("remarks", "policy_enquiry_remarks"),
+	("user_logged_in", "user_logged_in"),
+)
+
+
+def _is_na(value):
+	"""True for falsy values and NA placeholder strings"""
+	if not value:
+		return True
+	return isinstance(value, str) and value.strip().upper() in _NA_VALUES
+
 
 class PolicyCreationService:
 	def __init__(self):
@@ -17,116 +79,185 @@ class PolicyCreationService:
 		"""
 		Create a policy record (Motor/Health) from Policy Document using dynamic field mapping
 		"""
-		# Input validation using common service
-		CommonService.validate_required_fields(
-			{"policy_document_name": policy_document_name}, ["policy_document_name"]
-		)
-		if not isinstance(policy_document_name, str):
-			frappe.throw(
-				f"Invalid input: policy document name must be a string, got {type(policy_document_name).__name__}: {policy_document_name}"
+		policy_type = self._validate_creation_input(policy_document_name, policy_type)
+
+		try:
+			policy_record, link_field, mapping_results = self._insert_policy_record(
+				policy_document_name, policy_type
 			)
 
-		policy_type = CommonService.validate_policy_type(policy_type)
+			# Update Policy Document with link (single-column update, no controller hooks)
+			frappe.db.set_value("Policy Document", policy_document_name, link_field, policy_record.name)
+			frappe.db.commit()
 
-		try:
-			# Get Policy Document
-			policy_doc = frappe.get_doc("Policy Document", policy_document_name)
+			return self._build_creation_result(policy_record, policy_type, mapping_results)
 
-			if not policy_doc.extracted_fields:
-				frappe.throw("No extracted fields found. Please extract fields first.")
+		except Exception as e:
+			frappe.db.rollback()
+			CommonService.handle_processing_exception("creating policy record", e)
 
-			# Get field mapping from Policy Reader Settings
-			field_mapping = CommonService.get_field_mapping_for_policy_type(policy_type)
+	def create_policy_records_bulk(self, policy_document_names, policy_type):
+		"""
+		Create policy records for several Policy Documents in a single transaction
 
-			frappe.logger().info(f"=== POLICY CREATION DEBUG for {policy_type} ===")
-			frappe.logger().info(
-				f"Field mapping retrieved: {len(field_mapping) if field_mapping else 0} entries"
-			)
+		Back-links are written with one bulk update and committed once; any failure
+		rolls back the whole batch. Every document must have been extracted as
+		policy_type; repeated names are created once.
+		"""
+		policy_type = CommonService.validate_policy_type(policy_type)
+		policy_document_names = list(dict.fromkeys(policy_document_names))
+		for policy_document_name in policy_document_names:
+			self._validate_creation_input(policy_document_name, policy_type)
+			self._validate_bulk_member(policy_document_name, policy_type)
 
-			if not field_mapping:
-				frappe.logger().error(f"No field mapping found for {policy_type}")
-				frappe.throw(
-					f"No field mapping found for {policy_type}. Please refresh field mappings in Policy Reader Settings."
+		try:
+			results = []
+			back_links = {}
+			for policy_document_name in policy_document_names:
+				policy_record, link_field, mapping_results = self._insert_policy_record(
+					policy_document_name, policy_type
 				)
+				back_links[policy_document_name] = {link_field: policy_record.name}
+				results.append(self._build_creation_result(policy_record, policy_type, mapping_results))
 
-			# Parse extracted data with validation using common service
-			extracted_data = CommonService.safe_parse_json(policy_doc.extracted_fields)
-			if not isinstance(extracted_data, dict):
-				frappe.throw("Invalid input: extracted fields must be a valid JSON object")
+			if back_links:
+				frappe.db.bulk_update("Policy Document", back_links)
+			frappe.db.commit()
 
-			frappe.logger().info(f"Raw extracted fields: {extracted_data}")
-			frappe.logger().info(f"Extracted fields type: {type(extracted_data)}")
+			return {"success": True, "policy_type": policy_type, "results": results}
 
-			# Use extracted data directly (already parsed by Claude Vision Service)
-			parsed_data = extracted_data if isinstance(extracted_data, dict) else {}
-			frappe.logger().info(
-				f"Parsed data keys: {list(parsed_data.keys()) if parsed_data else 'No parsed data'}"
+		except Exception as e:
+			frappe.db.rollback()
+			CommonService.handle_processing_exception("creating policy records in bulk", e)
+
+	def _validate_creation_input(self, policy_document_name, policy_type):
+		"""Validate creation arguments and return the normalized policy type"""
+		# Input validation using common service
+		CommonService.validate_required_fields(
+			{"policy_document_name": policy_document_name}, ["policy_document_name"]
+		)
+		if not isinstance(policy_document_name, str):
+			frappe.throw(
+				f"Invalid input: policy document name must be a string, got {type(policy_document_name).__name__}: {policy_document_name}"
 			)
-			frappe.logger().info(
-				f"Parsed data sample: {dict(list(parsed_data.items())[:5]) if parsed_data else 'No data'}"
+
+		return CommonService.validate_policy_type(policy_type)
+
+	def _validate_bulk_member(self, policy_document_name, policy_type):
+		"""Ensure a bulk batch member was extracted as policy_type and has no policy yet"""
+		policy_doc = frappe.db.get_value(
+			"Policy Document",
+			policy_document_name,
+			["extraction_policy_type", "policy_type", "motor_policy", "health_policy"],
+			as_dict=True,
+		)
+		if not policy_doc:
+			frappe.throw(f"Policy Document {policy_document_name} not found")
+
+		document_type = cstr(policy_doc.extraction_policy_type or policy_doc.policy_type).lower()
+		if document_type != policy_type:
+			frappe.throw(
+				f"Invalid input: {policy_document_name} is a {document_type or 'untyped'} policy document; "
+				f"all documents in a bulk request must be {policy_type} documents"
 			)
 
-			# Create policy document
-			if policy_type.lower() == "motor":
-				policy_record = frappe.new_doc("Motor Policy")
-			elif policy_type.lower() == "health":
-				policy_record = frappe.new_doc("Health Policy")
-			else:
-				frappe.throw(f"Unsupported policy type: {policy_type}")
+		policy_doctype, link_field = _POLICY_DISPATCH[policy_type]
+		if policy_doc.get(link_field):
+			frappe.throw(f"{policy_doctype} already exists for {policy_document_name}.")
 
-			# Set document link
-			policy_record.policy_document = policy_doc.name
-			policy_record.policy_file = policy_doc.policy_file
+	def _insert_policy_record(self, policy_document_name, policy_type):
+		"""
+		Build and insert the policy record for one Policy Document without committing
 
-			# Populate customer data from Policy Document if available
-			self._populate_customer_fields(policy_record, policy_doc)
+		Returns (policy_record, back-link field on Policy Document, mapping results).
+		"""
+		# Get Policy Document
+		policy_doc = frappe.get_doc("Policy Document", policy_document_name)
 
-			# Copy documents from Policy Document
-			self._copy_document_fields(policy_record, policy_doc)
+		if not policy_doc.extracted_fields:
+			frappe.throw("No extracted fields found. Please extract fields first.")
 
-			# Copy business information from Policy Document
-			self._copy_business_info_fields(policy_record, policy_doc)
+		logger = frappe.logger()
+		verbose = logger.isEnabledFor(logging.DEBUG)
 
-			# Copy checklist fields from Policy Document
-			self._copy_checklist_fields(policy_record, policy_doc)
+		# Get field mapping from Policy Reader Settings
+		field_mapping = CommonService.get_field_mapping_for_policy_type(policy_type)
 
-			# Define fields that should not be overwritten by AI extraction
-			protected_fields = self._get_protected_fields()
+		if verbose:
+			logger.debug("=== POLICY CREATION DEBUG for %s ===", policy_type)
+			logger.debug("Field mapping retrieved: %d entries", len(field_mapping) if field_mapping else 0)
 
-			# Dynamic field mapping
-			field_mapping_service = FieldMappingService()
-			mapping_results = field_mapping_service.map_fields_dynamically(
-				parsed_data, field_mapping, policy_record, policy_type, protected_fields
+		if not field_mapping:
+			logger.error("No field mapping found for %s", policy_type)
+			frappe.throw(
+				f"No field mapping found for {policy_type}. Please refresh field mappings in Policy Reader Settings."
 			)
 
-			# Auto-populate processor information based on logged-in user
-			self._populate_processor_fields(policy_record)
-
-			# Validate and save
-			policy_record.validate()
-			policy_record.insert()
+		# Parse extracted data with validation using common service; skip the
+		# reparse when the field already holds a dict
+		extracted_data = policy_doc.extracted_fields
+		if not isinstance(extracted_data, dict):
+			extracted_data = CommonService.safe_parse_json(extracted_data)
+		if not isinstance(extracted_data, dict):
+			frappe.throw("Invalid input: extracted fields must be a valid JSON object")
+
+		# Use extracted data directly (already parsed by Claude Vision Service)
+		parsed_data = extracted_data
+		if verbose:
+			logger.debug("Raw extracted fields: %s", extracted_data)
+			logger.debug("Parsed data keys: %s", list(parsed_data) or "No parsed data")
+			logger.debug("Parsed data sample: %s", dict(list(parsed_data.items())[:5]) or "No data")
+
+		# Create policy document
+		if policy_type not in _POLICY_DISPATCH:
+			frappe.throw(f"Unsupported policy type: {policy_type}")
+		policy_doctype, link_field = _POLICY_DISPATCH[policy_type]
+		policy_record = frappe.new_doc(policy_doctype)
+
+		# Set document link
+		policy_record.policy_document = policy_doc.name
+		policy_record.policy_file = policy_doc.policy_file
+
+		# Populate customer data from Policy Document if available
+		self._populate_customer_fields(policy_record, policy_doc)
+
+		# Copy documents from Policy Document
+		self._copy_document_fields(policy_record, policy_doc)
+
+		# Copy business information from Policy Document
+		self._copy_business_info_fields(policy_record, policy_doc)
+
+		# Copy checklist fields from Policy Document
+		self._copy_checklist_fields(policy_record, policy_doc)
+
+		# Define fields that should not be overwritten by AI extraction
+		protected_fields = self._get_protected_fields()
+
+		# Dynamic field mapping
+		field_mapping_service = FieldMappingService()
+		mapping_results = field_mapping_service.map_fields_dynamically(
+			parsed_data, field_mapping, policy_record, policy_type, protected_fields
+		)
 
-			# Update Policy Document with link
-			if policy_type.lower() == "motor":
-				policy_doc.motor_policy = policy_record.name
-			elif policy_type.lower() == "health":
-				policy_doc.health_policy = policy_record.name
+		# Auto-populate processor information based on logged-in user
+		self._populate_processor_fields(policy_record)
 
-			policy_doc.save()
-			frappe.db.commit()
+		# Validate and save
+		policy_record.validate()
+		policy_record.insert()
 
-			return {
-				"success": True,
-				"policy_name": policy_record.name,
-				"policy_type": policy_type,
-				"mapped_fields": mapping_results["mapped_count"],
-				"unmapped_fields": mapping_results["unmapped_fields"],
-				"message": f"{policy_type} Policy {policy_record.name} created successfully with {mapping_results['mapped_count']} fields",
-			}
+		return policy_record, link_field, mapping_results
 
-		except Exception as e:
-			frappe.db.rollback()
-			CommonService.handle_processing_exception("creating policy record", e)
+	def _build_creation_result(self, policy_record, policy_type, mapping_results):
+		"""Response payload for a created policy record"""
+		return {
+			"success": True,
+			"policy_name": policy_record.name,
+			"policy_type": policy_type,
+			"mapped_fields": mapping_results["mapped_count"],
+			"unmapped_fields": mapping_results["unmapped_fields"],
+			"message": f"{policy_type} Policy {policy_record.name} created successfully with {mapping_results['mapped_count']} fields",
+		}
 
 	def _get_protected_fields(self):
 		"""
@@ -253,21 +384,8 @@ class PolicyCreationService:
 	def _copy_document_fields(self, policy_record, policy_doc):
 		"""Copy document attachment fields from Policy Document to policy record"""
 		try:
-			document_fields = [
-				"final_quote_renewal_notice",
-				"quote_comparison",
-				"mandate_doc",
-				"kyc_doc",
-				"proposal_form",
-				"portability_form",
-				"policy_copy_doc",
-				"rc_copy",
-				"passport_copy",
-				"payment_details_doc",
-			]
-
 			copied_count = 0
-			for field in document_fields:
+			for field in _DOCUMENT_FIELDS:
 				if hasattr(policy_doc, field) and getattr(policy_doc, field):
 					setattr(policy_record, field, getattr(policy_doc, field))
 					copied_count += 1
@@ -283,32 +401,8 @@ class PolicyCreationService:
 	def _copy_checklist_fields(self, policy_record, policy_doc):
 		"""Copy checklist fields from Policy Document to policy record"""
 		try:
-			checklist_mapping = {
-				"checklist_department": "department",
-				"checklist_policy_type": "policy_type",
-				"checklist_coverage_type": "coverage_type",
-				"checklist_old_control_number": "old_control_number",
-				"checklist_branch_code": "branch_code",
-				"checklist_biz_type": "biz_type",
-				"checklist_customer_vertical": "customer_vertical",
-				"checklist_rm_code": "rm_code",
-				"checklist_csc_code": "csc_code",
-				"checklist_tc_code": "tc_code",
-				"checklist_ref_code": "ref_code",
-				"checklist_customer_pan": "customer_pan",
-				"checklist_customer_gst": "customer_gst",
-				"checklist_category": "category",
-				"checklist_portability": "campaign_name",
-				"rm": "rm",
-				"rm_code": "rm_rm_code",
-				"csc": "csc",
-				"csc_code": "csc_csc_code",
-				"remarks": "policy_enquiry_remarks",
-				"user_logged_in":"user_logged_in"
-			}
-
 			copied_count = 0
-			for source_field, target_field in checklist_mapping.items():
+			for source_field, target_field in _CHECKLIST_FIELD_PAIRS:
 				value = getattr(policy_doc, source_field, None)
 				if value:
 					setattr(policy_record, target_field, value)
@@ -369,9 +463,7 @@ class PolicyCreationService:
 			if not text:
 				return ""
 			value = cstr(text).strip().lower()
-			import re
-
-			value = re.sub(r"[^a-z0-9]+", " ", value)
+			value = _NON_ALNUM_RE.sub(" ", value)
 			value = " ".join(part for part in value.split() if part)
 			return value
 		except Exception:
@@ -390,8 +482,6 @@ class PolicyCreationService:
 	def _find_best_match(self, key, mapping_keys):
 		"""Find a fuzzy best match candidate for an unmapped key"""
 		try:
-			from difflib import get_close_matches
-
 			candidates = get_close_matches(key, mapping_keys, n=3, cutoff=0.75)
 			return candidates
 		except Exception:
@@ -405,69 +495,82 @@ class PolicyCreationService:
 		unmapped_fields = []
 		suggestions = {}
 
-		frappe.logger().info(f"=== FIELD MAPPING DEBUG ===")
-		frappe.logger().info(f"Parsed data keys: {list(parsed_data.keys())}")
-		frappe.logger().info(f"Field mapping keys: {list(field_mapping.keys())}")
-		frappe.logger().info(f"Policy record doctype: {policy_record.doctype}")
+		logger = CommonService.get_field_mapping_logger()
+		verbose = logger.isEnabledFor(logging.DEBUG)
+		if verbose:
+			logger.debug("=== FIELD MAPPING DEBUG ===")
+			logger.debug("Parsed data keys: %s", list(parsed_data))
+			logger.debug("Field mapping keys: %s", list(field_mapping))
+			logger.debug("Policy record doctype: %s", policy_record.doctype)
 
 		# Build normalized mapping for robust matching
 		normalized_mapping = self._build_normalized_mapping(field_mapping)
 
+		# Resolve DocType metadata once instead of once per field
+		meta = frappe.get_meta(policy_record.doctype)
+
+		# Converted values are collected and applied to the record in one update()
+		updates = {}
+
+		# Bind hot-loop lookups to locals
+		get_field = normalized_mapping.get
+		normalize = self._normalize_key
+		convert = self.convert_field_value
+		doctype = policy_record.doctype
+
 		# First pass: direct and normalized-key matching over parsed_data keys
 		for raw_key, raw_value in parsed_data.items():
-			if raw_value is None or str(raw_value).strip() == "":
+			if raw_value is None or (isinstance(raw_value, str) and not raw_value.strip()):
 				continue
 
-			# Try direct match
-			policy_field_name = normalized_mapping.get(raw_key)
-
-			# Try normalized key match
-			if not policy_field_name:
-				nk = self._normalize_key(raw_key)
-				policy_field_name = normalized_mapping.get(nk)
+			# Try direct match, then normalized key match
+			policy_field_name = get_field(raw_key) or get_field(normalize(raw_key))
 
 			if policy_field_name:
 				try:
-					converted_value = self.convert_field_value(
-						policy_field_name, raw_value, policy_record.doctype
-					)
+					converted_value = convert(policy_field_name, raw_value, doctype, meta=meta)
 					if converted_value is not None:
-						setattr(policy_record, policy_field_name, converted_value)
+						updates[policy_field_name] = converted_value
 						mapped_count += 1
-						frappe.logger().info(f"✓ Mapped {raw_key} -> {policy_field_name}: {converted_value}")
+						logger.debug("✓ Mapped %s -> %s: %s", raw_key, policy_field_name, converted_value)
 					else:
 						unmapped_fields.append(raw_key)
 				except Exception as e:
-					frappe.logger().error(f"✗ Error mapping {raw_key}: {str(e)}")
+					logger.error("✗ Error mapping %s: %s", raw_key, e)
 					unmapped_fields.append(raw_key)
 			else:
 				unmapped_fields.append(raw_key)
 				# Collect suggestions to guide alias additions
-				nk = self._normalize_key(raw_key)
-				cands = self._find_best_match(nk, list(normalized_mapping.keys()))
+				cands = self._find_best_match(normalize(raw_key), list(normalized_mapping))
 				if cands:
 					suggestions[raw_key] = cands
 
+		policy_record.update(updates)
+
 		# Log summary
-		frappe.logger().info(f"=== FIELD MAPPING SUMMARY ===")
-		frappe.logger().info(f"Mapped: {mapped_count}, Unmapped: {len(unmapped_fields)}")
-		frappe.logger().info(f"Unmapped fields: {unmapped_fields}")
-		if suggestions:
-			frappe.logger().info(f"Suggestions for unmapped: {frappe.as_json(suggestions)}")
+		if verbose:
+			logger.debug("=== FIELD MAPPING SUMMARY ===")
+			logger.debug("Mapped: %d, Unmapped: %d", mapped_count, len(unmapped_fields))
+			logger.debug("Unmapped fields: %s", unmapped_fields)
+			if suggestions:
+				logger.debug("Suggestions for unmapped: %r", suggestions)
 
 		return {"mapped_count": mapped_count, "unmapped_fields": unmapped_fields, "suggestions": suggestions}
 
-	def convert_field_value(self, field_name, value, doctype):
+	def convert_field_value(self, field_name, value, doctype, meta=None):
 		"""
 		Convert field value to appropriate type based on DocType field definition
+
+		Pass `meta` when converting many fields of the same DocType to skip the lookup.
 		"""
 		try:
 			# Handle null/empty/NA values first
-			if not value or str(value).strip().upper() in ["NA", "N/A", "NULL", "NONE", ""]:
+			if _is_na(value):
 				return None
 
 			# Get field metadata
-			meta = frappe.get_meta(doctype)
+			if meta is None:
+				meta = frappe.get_meta(doctype)
 			field = meta.get_field(field_name)
 
 			if not field:
@@ -501,18 +604,18 @@ class PolicyCreationService:
 		Convert date value from DD/MM/YYYY format to proper date object
 		"""
 		try:
-			if not value or str(value).strip().upper() in ["NA", "N/A", "NULL", "NONE", ""]:
+			if _is_na(value):
 				return None
 
 			# Handle DD/MM/YYYY format specifically
-			date_str = str(value).strip()
-			if "/" in date_str and len(date_str.split("/")) == 3:
-				parts = date_str.split("/")
-				if len(parts[0]) <= 2 and len(parts[1]) <= 2 and len(parts[2]) == 4:
-					# DD/MM/YYYY format
-					day, month, year = parts
-					formatted_date = f"{year}-{month.zfill(2)}-{day.zfill(2)}"
-					return getdate(formatted_date)
+			match = _DMY_RE.match(str(value))
+			if match:
+				return datetime.date(int(match[3]), int(match[2]), int(match[1]))
+
+			# ISO-8601 via the C parser when available
+			parsed = CommonService.parse_iso_datetime(value)
+			if parsed is not None:
+				return parsed.date()
 
 			# Fall back to getdate for other formats
 			return getdate(value)
@@ -525,24 +628,20 @@ class PolicyCreationService:
 		Convert datetime value from DD/MM/YYYY format to proper datetime object
 		"""
 		try:
-			if not value or str(value).strip().upper() in ["NA", "N/A", "NULL", "NONE", ""]:
+			if _is_na(value):
 				return None
 
-			# Handle DD/MM/YYYY format specifically
-			date_str = str(value).strip()
-			if "/" in date_str and len(date_str.split("/")) == 3:
-				parts = date_str.split("/")
-				if len(parts[0]) <= 2 and len(parts[1]) <= 2 and len(parts[2]) == 4:
-					# DD/MM/YYYY format - convert to YYYY-MM-DD HH:MM:SS
-					day, month, year = parts
-					formatted_datetime = f"{year}-{month.zfill(2)}-{day.zfill(2)} 00:00:00"
-					from frappe.utils import get_datetime
+			# Handle DD/MM/YYYY format specifically (midnight)
+			match = _DMY_RE.match(str(value))
+			if match:
+				return datetime.datetime(int(match[3]), int(match[2]), int(match[1]))
 
-					return get_datetime(formatted_datetime)
+			# ISO-8601 via the C parser when available
+			parsed = CommonService.parse_iso_datetime(value)
+			if parsed is not None:
+				return parsed
 
 			# Fall back to get_datetime for other formats
-			from frappe.utils import get_datetime
-
 			return get_datetime(value)
 		except Exception as e:
 			frappe.logger().error(f"Error converting datetime value {value}: {str(e)}")
@@ -581,28 +680,26 @@ class PolicyCreationService:
 		Normalize select field value to match available options
 		If no match found, apply field-specific defaults
 		"""
-		if not value or not options:
-			return None
-
-		# Handle NA values
-		if str(value).strip().upper() in ["NA", "N/A", "NULL", "NONE", ""]:
+		# Handle empty and NA values
+		if not options or _is_na(value):
 			return None
 
-		# Split options by newline
-		available_options = [opt.strip() for opt in options.split("\n") if opt.strip()]
+		# Split options by newline (cached per options string)
+		available_options, options_by_lower = CommonService.parse_select_options(options)
 
 		# Try exact match first
 		if value in available_options:
 			return value
 
 		# Try case-insensitive match
-		for option in available_options:
-			if option.lower() == value.lower():
-				return option
+		value_lower = value.lower()
+		option = options_by_lower.get(value_lower)
+		if option:
+			return option
 
 		# Try partial match
-		for option in available_options:
-			if value.lower() in option.lower() or option.lower() in value.lower():
+		for option_lower, option in options_by_lower.items():
+			if value_lower in option_lower or option_lower in value_lower:
 				return option
 
 		# No match found - check if we should apply a default
@@ -655,10 +752,9 @@ class PolicyCreationService:
 				return {"valid": False, "error": "Policy type is not set. Please set the policy type first."}
 
 			# Check if policy already exists
-			if policy_doc.policy_type.lower() == "motor" and policy_doc.motor_policy:
-				return {"valid": False, "error": "Motor policy already exists for this document."}
-			elif policy_doc.policy_type.lower() == "health" and policy_doc.health_policy:
-				return {"valid": False, "error": "Health policy already exists for this document."}
+			policy_doctype, link_field = _POLICY_DISPATCH.get(policy_doc.policy_type.lower(), (None, None))
+			if link_field and policy_doc.get(link_field):
+				return {"valid": False, "error": f"{policy_doctype} already exists for this document."}
 
 			return {"valid": True}
 
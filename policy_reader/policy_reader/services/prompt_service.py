@@ -1,9 +1,38 @@
 # Copyright (c) 2025, Clapgrow Software and contributors
 # For license information, please see license.txt
 
+import functools
+
 import frappe
 from policy_reader.policy_reader.services.common_service import CommonService
 
+# Optional tokenizer for budgeting the policy text by tokens; without it the text is
+# cut at PROMPT_TEXT_CHAR_LIMIT characters
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+PROMPT_TEXT_TOKEN_BUDGET = 50000
+PROMPT_TEXT_CHAR_LIMIT = 200000
+
+
+@functools.lru_cache(maxsize=1)
+def _get_token_encoding():
+    """
+    Load the tokenizer on first use rather than at import.
+
+    get_encoding may download the encoding file, which should not slow down (or
+    block, on offline hosts) every worker that imports this module.
+    """
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception:
+        # The encoding file could not be fetched (offline hosts)
+        return None
+
 
 class PromptService:
     """Service for building extraction prompts"""
@@ -16,14 +45,12 @@ class PromptService:
         try:
             # Get field mapping from settings
             policy_reader_settings = CommonService.get_policy_reader_settings()
-            mapping = policy_reader_settings.get_cached_field_mapping(policy_type.lower()) or {}
+            mapping_items = policy_reader_settings.get_cached_field_mapping_items(policy_type.lower())
             
-            # Get canonical fields (fields that map to themselves)
-            canonical_fields = [k for k, v in mapping.items() if k == v]
-            canonical_fields = sorted(set(canonical_fields))
+            # Canonical fields and their prompt block, memoized per mapping
+            canonical_fields, fields_list, _ = PromptService._build_mapping_sections(mapping_items)
             
             if canonical_fields:
-                fields_list = "\n".join([f"- {field}" for field in canonical_fields])
                 
                 prompt = f"""Analyze this {policy_type.lower()} insurance policy PDF and extract the following information as a flat JSON object:
 
@@ -63,19 +90,17 @@ IMPORTANT:
 """
 
                 return prompt
-            else:
-                # Fallback prompt if no mapping available
-                return f"Extract key information from this {policy_type.lower()} insurance policy as JSON."
-                
+        
         except Exception as e:
             frappe.log_error(f"Error building vision prompt: {str(e)}", frappe.get_traceback())
-            return f"Extract key information from this {policy_type.lower()} insurance policy as JSON."
+        
+        # Fallback prompt if no mapping is available or the prompt could not be built
+        return f"Extract key information from this {policy_type.lower()} insurance policy as JSON."
     
     @staticmethod
     def build_prompt_from_mapping(policy_type, extracted_text, settings):
         """Build a full extraction prompt from the active alias→canonical mapping"""
         try:
-            truncation_limit = 200000
             ptype = (policy_type or "").lower()
             
             # Get mapping from cache; if empty, build defaults
@@ -83,47 +108,97 @@ IMPORTANT:
             if not isinstance(mapping, dict) or not mapping:
                 return PromptService._build_fallback_prompt(ptype, extracted_text)
             
-            # Canonical set (keys that map to themselves)
-            canonical_fields = [k for k, v in mapping.items() if k == v]
-            canonical_fields = sorted(set(canonical_fields))
-            
-            # Reverse index: canonical -> [aliases]
-            aliases_by_canonical = {}
-            for alias, canonical in mapping.items():
-                if alias == canonical:
-                    aliases_by_canonical.setdefault(canonical, [])
-                else:
-                    aliases_by_canonical.setdefault(canonical, []).append(alias)
-            
-            # Build sections
-            required_keys_section = "\n".join([f"- {key}" for key in canonical_fields])
-            
-            # Limit alias list lengths per key to keep prompt concise
-            alias_lines = []
-            for key in canonical_fields:
-                aliases = sorted(set(aliases_by_canonical.get(key, [])))
-                if aliases:
-                    # Show up to 5 aliases per key
-                    shown_aliases = aliases[:5]
-                    alias_text = ", ".join(shown_aliases)
-                    if len(aliases) > 5:
-                        alias_text += f" (and {len(aliases) - 5} more)"
-                    alias_lines.append(f"- {key}: {alias_text}")
-            
-            aliases_section = "\n".join(alias_lines) if alias_lines else "No aliases defined"
-            
             # Truncate text if too long
-            text_to_use = extracted_text
-            if len(extracted_text) > truncation_limit:
-                text_to_use = extracted_text[:truncation_limit] + "\n... [truncated]"
+            text_to_use, truncated = PromptService._truncate_policy_text(extracted_text)
             
-            prompt = f"""Extract the following fields from the {ptype} insurance policy text as a flat JSON object.
+            # Mapping-dependent head and static tail are memoized; only the policy text
+            # is stitched in per call, in a single join
+            prompt_head, prompt_tail = PromptService._build_prompt_skeleton(ptype, tuple(mapping.items()))
+            prompt = "".join((
+                prompt_head,
+                text_to_use,
+                "\n... [truncated]" if truncated else "",
+                prompt_tail,
+            ))
+
+            return prompt
 
-REQUIRED FIELDS TO EXTRACT:
-{required_keys_section}
+        except Exception as e:
+            frappe.log_error(f"Error building prompt from mapping: {str(e)}", frappe.get_traceback())
+            return PromptService._build_fallback_prompt(ptype, extracted_text)
+    
+    @staticmethod
+    def _truncate_policy_text(text):
+        """
+        Bound the policy text to PROMPT_TEXT_TOKEN_BUDGET tokens.
 
-FIELD ALIASES (look for these variations):
-{aliases_section}
+        Returns (text, truncated). A token spans at least one character, so text no
+        longer than the budget is returned without encoding it.
+        """
+        text = text or ""
+        token_encoding = _get_token_encoding()
+        if token_encoding is None:
+            if len(text) <= PROMPT_TEXT_CHAR_LIMIT:
+                return text, False
+            return text[:PROMPT_TEXT_CHAR_LIMIT], True
+        
+        if len(text) <= PROMPT_TEXT_TOKEN_BUDGET:
+            return text, False
+        tokens = token_encoding.encode(text, disallowed_special=())
+        if len(tokens) <= PROMPT_TEXT_TOKEN_BUDGET:
+            return text, False
+        return token_encoding.decode(tokens[:PROMPT_TEXT_TOKEN_BUDGET]), True
+    
+    @staticmethod
+    @functools.lru_cache(maxsize=16)
+    def _build_mapping_sections(mapping_items):
+        """
+        Build the mapping-derived prompt sections from alias→canonical mapping items.
+
+        Returns (canonical_fields, required_keys_section, aliases_section); memoized so
+        the reverse index and joins are only rebuilt when the mapping changes.
+        """
+        # Canonical set (keys that map to themselves)
+        canonical_fields = sorted({k for k, v in mapping_items if k == v})
+        
+        # Reverse index: canonical -> [aliases]
+        aliases_by_canonical = {}
+        for alias, canonical in mapping_items:
+            if alias == canonical:
+                aliases_by_canonical.setdefault(canonical, [])
+            else:
+                aliases_by_canonical.setdefault(canonical, []).append(alias)
+        
+        required_keys_section = "\n".join([f"- {key}" for key in canonical_fields])
+        
+        # Limit alias list lengths per key to keep prompt concise
+        alias_lines = []
+        for key in canonical_fields:
+            aliases = sorted(set(aliases_by_canonical.get(key, [])))
+            if aliases:
+                # Show up to 5 aliases per key
+                shown_aliases = aliases[:5]
+                alias_text = ", ".join(shown_aliases)
+                if len(aliases) > 5:
+                    alias_text += f" (and {len(aliases) - 5} more)"
+                alias_lines.append(f"- {key}: {alias_text}")
+        
+        aliases_section = "\n".join(alias_lines) if alias_lines else "No aliases defined"
+        return tuple(canonical_fields), required_keys_section, aliases_section
+    
+    @staticmethod
+    @functools.lru_cache(maxsize=16)
+    def _build_prompt_skeleton(ptype, mapping_items):
+        """Return the (head, tail) around the policy text for build_prompt_from_mapping"""
+        _, required_keys_section, aliases_section = PromptService._build_mapping_sections(mapping_items)
+        
+        prompt_head = "".join((
+            f"Extract the following fields from the {ptype} insurance policy text as a flat JSON object.\n\n",
+            "REQUIRED FIELDS TO EXTRACT:\n",
+            required_keys_section,
+            "\n\nFIELD ALIASES (look for these variations):\n",
+            aliases_section,
+            """
 
 EXTRACTION RULES:
 1. Return ONLY valid flat JSON (no nested objects)
@@ -136,13 +211,14 @@ EXTRACTION RULES:
 8. No explanations, no markdown, no code blocks
 
 POLICY TEXT:
-{text_to_use}
-
-RESPOND WITH VALID FLAT JSON ONLY - NO EXPLANATIONS, NO MARKDOWN, NO CODE BLOCKS."""
-
-            # Add health-specific insured persons extraction instructions
-            if ptype == "health":
-                prompt += """
+""",
+        ))
+        
+        prompt_tail = "\n\nRESPOND WITH VALID FLAT JSON ONLY - NO EXPLANATIONS, NO MARKDOWN, NO CODE BLOCKS."
+        
+        # Add health-specific insured persons extraction instructions
+        if ptype == "health":
+            prompt_tail += """
 
 INSURED PERSONS TABLE EXTRACTION:
 This policy may contain a table listing multiple insured members/dependents.
@@ -161,20 +237,13 @@ IMPORTANT:
 - Gender: Use "Male", "Female", or "Other"
 - Relation: Use "Self", "Spouse", "Wife", "Husband", "Son", "Daughter", "Father", "Mother", or "Other"
 """
-
-            return prompt
-
-        except Exception as e:
-            frappe.log_error(f"Error building prompt from mapping: {str(e)}", frappe.get_traceback())
-            return PromptService._build_fallback_prompt(ptype, extracted_text)
+        
+        return prompt_head, prompt_tail
     
     @staticmethod
     def _build_fallback_prompt(policy_type, extracted_text):
         """Build a simple fallback prompt if no specific prompt is available"""
-        try:
-            truncation_limit = 200000  # Default text truncation limit (200k chars)
-        except Exception:
-            truncation_limit = 200000
+        text_to_use, _ = PromptService._truncate_policy_text(extracted_text)
         
         if policy_type.lower() == "motor":
             return f"""Extract motor insurance policy information as FLAT JSON:
@@ -189,7 +258,7 @@ EXTRACTION RULES:
 - Return ONLY valid JSON, no explanations or markdown
 
 POLICY TEXT:
-{extracted_text[:truncation_limit]}
+{text_to_use}
 
 RESPOND WITH VALID FLAT JSON ONLY - NO EXPLANATIONS, NO MARKDOWN, NO CODE BLOCKS."""
         
@@ -219,7 +288,7 @@ Look for tables with member/dependent details. Map each row by position:
 - Relation: Use "Self", "Spouse", "Wife", "Husband", "Son", "Daughter", "Father", "Mother", or "Other"
 
 POLICY TEXT:
-{extracted_text[:truncation_limit]}
+{text_to_use}
 
 RESPOND WITH VALID FLAT JSON ONLY - NO EXPLANATIONS, NO MARKDOWN, NO CODE BLOCKS."""
         
@@ -227,6 +296,6 @@ RESPOND WITH VALID FLAT JSON ONLY - NO EXPLANATIONS, NO MARKDOWN, NO CODE BLOCKS
             return f"""Extract key information from this {policy_type} insurance policy as JSON.
 
 POLICY TEXT:
-{extracted_text[:truncation_limit]}
+{text_to_use}
 
 RESPOND WITH VALID FLAT JSON ONLY - NO EXPLANATIONS, NO MARKDOWN, NO CODE BLOCKS."""
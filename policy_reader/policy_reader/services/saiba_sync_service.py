@@ -1,12 +1,225 @@
 # Copyright (c) 2025, Clapgrow Software and contributors
 # For license information, please see license.txt
 
+import json
 import re
-from datetime import datetime, timedelta
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
 
 import frappe
 import requests
 from frappe.utils import cint, cstr, flt, getdate, now
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Optional faster JSON encoder for request bodies and stored sync logs; stdlib json is used without it
+try:
+	import orjson
+except ImportError:
+	orjson = None
+
+# Required SAIBA field names per policy type, derived from SAIBA Validation Settings;
+# cleared when those settings are saved
+REQUIRED_FIELDS_CACHE_KEY = "saiba:required:{}"
+REQUIRED_FIELDS_CACHE_TTL = 300
+
+# Redis key for the SAIBA bearer token; it expires a few minutes before SAIBA's
+# own validity window so a request never goes out with a just-expired token
+SAIBA_TOKEN_CACHE_KEY = "saiba:token"
+
+# Serialises /GetToken calls across workers; held at most this long (seconds)
+SAIBA_TOKEN_REFRESH_LOCK = "saiba:token:refresh"
+TOKEN_REFRESH_LOCK_TIMEOUT = 45
+
+# The scheduled refresh replaces the token once fewer than this many seconds remain
+TOKEN_REFRESH_AHEAD = 30 * 60
+
+# SAIBA success / duplicate-entry messages carrying the control number
+_CONTROL_NO_RE = re.compile(r"Control No\s*:\s*(\d+)", re.IGNORECASE)
+_DUPLICATE_POLICY_RE = re.compile(
+	r"policy\s*no.*already\s*exists\s*in\s*saiba.*control\s*no\s*:\s*(\d+)", re.IGNORECASE
+)
+
+# Columns _bulk_update_sync_status may write; anything else is rejected
+_SYNC_STATUS_FIELDS = (
+	"saiba_sync_status",
+	"saiba_sync_datetime",
+	"saiba_sync_error",
+	"saiba_control_number",
+	"saiba_customer_code",
+	"saiba_sync_response",
+)
+
+# (name, gender, dob, relation) source fields and SAIBA keys for insured persons 1-5
+_INSURED_FIELDS = tuple(
+	(
+		f"insured_{i}_name",
+		f"insured{i}Name",
+		f"insured_{i}_gender",
+		f"insured{i}Gender",
+		f"insured_{i}_dob",
+		f"insured{i}DOB",
+		f"insured_{i}_relation",
+		f"insured{i}Relation",
+	)
+	for i in range(1, 6)
+)
+
+
+def _format_saiba_date(date_value):
+	"""Format date to DD-MM-YYYY for SAIBA API ("" when empty or unparseable)"""
+	if not date_value:
+		return ""
+
+	try:
+		# date and datetime values (what Frappe hands back for Date fields) format directly;
+		# ISO strings skip getdate's dateutil parsing
+		if not isinstance(date_value, date):
+			try:
+				date_value = date.fromisoformat(date_value[:10])
+			except (TypeError, ValueError):
+				date_value = getdate(date_value)
+		return f"{date_value.day:02d}-{date_value.month:02d}-{date_value.year}"
+	except Exception:
+		return ""
+
+
+def _yes_no(yes_value):
+	"""Converter returning "Yes" for `yes_value` and "No" otherwise"""
+	return lambda value: "Yes" if value == yes_value else "No"
+
+
+# Payload specs: (SAIBA key, source fields - first non-empty wins, converter, fallback
+# used when the converted value is empty). cint/cstr already map None and "" to 0/"".
+_MOTOR_PAYLOAD_SPEC = (
+	("custCode", ("customer_code",), cint, None),
+	("posPolicy", ("pos_misp_ref",), cstr, "No"),
+	("bizType", ("biz_type",), cstr, "New"),
+	("insBranchCode", ("insurer_branch_code",), cint, None),
+	("issuenceDate", ("policy_issuance_date",), _format_saiba_date, None),
+	("busBrokDate", ("bus_brok_date", "policy_issuance_date"), _format_saiba_date, None),
+	("startDate", ("policy_start_date",), _format_saiba_date, None),
+	("expiryDate", ("policy_expiry_date",), _format_saiba_date, None),
+	("policyReceivedDate", ("receive_date",), _format_saiba_date, None),
+	("policyReceivedFormat", ("policy_received_format",), cstr, None),
+	("policyType", ("policy_type",), cstr, None),
+	("department", ("department",), cstr, None),
+	("coverageType", ("coverage_type",), cstr, "1+1"),
+	("policyVertical", ("customer_vertical",), cstr, None),
+	("policyNo", ("policy_no",), cstr, None),
+	("isRenewable", ("is_renewable",), _yes_no("YES"), None),
+	("newRenewal", ("new_renewal",), cstr, "New"),
+	("prevPolicy", ("prev_policy",), cstr, "No"),
+	("vehicleNo", ("vehicle_no",), cstr, None),
+	("make", ("make",), cstr, None),
+	("model", ("model",), cstr, None),
+	("variant", ("variant",), cstr, None),
+	("registrationDate", ("registration_date", "policy_start_date"), _format_saiba_date, None),
+	("typeofVehicle", ("type_of_vehicle",), cstr, "Private"),
+	("yearOfMan", ("year_of_man",), cint, None),
+	("chasisNo", ("chasis_no",), cstr, None),
+	("engineNo", ("engine_no",), cstr, None),
+	("cc", ("cc",), cstr, None),
+	("seat", ("seats",), cstr, None),
+	("fuel", ("fuel",), cstr, None),
+	("rtocode", ("rto_code",), cstr, None),
+	("ncb", ("ncb",), cint, None),
+	("odd", ("odd",), cint, None),
+	("vehicleCategory", ("category",), cstr, "PCV"),
+	("passengerGVW", ("passenger_gvw",), cstr, None),
+	("gvw", ("gvw_ton_kg",), cstr, None),
+	("noOfPassenger", ("no_of_passenger",), cstr, None),
+	("sumInsured", ("sum_insured",), cint, None),
+	("odPremium", ("net_od_premium",), cint, None),
+	("premRate", ("prem_rate",), cstr, None),
+	("tpPremium", ("tp_premium",), cint, None),
+	("lpodPremium", ("lpod_premium",), cint, None),
+	("coverangeOrTP", ("coverage_tp",), cstr, None),
+	("gst", ("gst",), cint, 18),
+	("stampDuty", ("stamp_duty",), cint, None),
+	("paymentMode", ("payment_mode_1",), cstr, None),
+	("bankName", ("bank_name",), cstr, None),
+	("paymentTranNo", ("payment_tran_no",), cstr, None),
+	("campaignName", ("campaign_name",), cstr, "No Campaign"),
+	("remarks", ("policy_enquiry_remarks",), cstr, None),
+	("policyStatus", ("policy_status_na",), cstr, "NA"),
+)
+
+_HEALTH_PAYLOAD_SPEC = (
+	("CustCode", ("customer_code",), cint, None),
+	("posPolicy", ("pos_policy",), cstr, "No"),
+	("bizType", ("biz_type",), cstr, "New"),
+	("insurerBranchCode", ("insurer_branch_code",), cint, None),
+	("issuenceDate", ("policy_issuance_date",), _format_saiba_date, None),
+	("startDate", ("policy_start_date",), _format_saiba_date, None),
+	("expiryDate", ("policy_expiry_date",), _format_saiba_date, None),
+	("policyType", ("policy_type",), cstr, None),
+	("policyNo", ("policy_no",), cstr, None),
+	("planName", ("plan_name",), cstr, None),
+	("isRenewable", ("is_renewable",), _yes_no("Yes"), None),
+	("prevPolicy", ("prev_policy",), cstr, None),
+	("sumInsured", ("sum_insured",), cint, None),
+	("netodPremium", ("net_od_premium",), cint, None),
+	("gst", ("gst_tax_percent",), cint, 18),
+	("stampDuty", ("stamp_duty",), cint, None),
+	("paymentMode", ("payment_mode",), cstr, None),
+	("bankName", ("bank_name",), cstr, None),
+	("paymentTranNo", ("payment_transaction_no",), cstr, None),
+	("Chq/DD/Trn No", ("payment_transaction_no",), cstr, None),
+	("remarks", ("policy_enquiry_remarks",), cstr, None),
+	("policyStatus", ("policy_status",), cstr, None),
+)
+
+
+def _payload_fields(spec):
+	"""Source columns a payload spec reads, in order and without repeats"""
+	return tuple(dict.fromkeys(field for _key, sources, _convert, _fallback in spec for field in sources))
+
+
+# Columns read by the payload builders; syncs load just these instead of the full document
+MOTOR_PAYLOAD_FIELDS = ("name",) + _payload_fields(_MOTOR_PAYLOAD_SPEC)
+HEALTH_PAYLOAD_FIELDS = (
+	("name",)
+	+ _payload_fields(_HEALTH_PAYLOAD_SPEC)
+	+ tuple(field for row in _INSURED_FIELDS for field in row[::2])
+)
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def _post_or_error(url, body, headers):
+	"""POST a serialised payload on the shared session; exceptions are returned, not raised"""
+	try:
+		return _get_session().post(url, data=body, headers=headers, timeout=60)
+	except Exception as e:
+		return e
+
+
+def _dumps(value):
+	"""Serialize to JSON bytes, with orjson when installed"""
+	if orjson is not None:
+		return orjson.dumps(value, default=str)
+	return json.dumps(value, default=str).encode("utf-8")
+
+
+def _get_session():
+	"""Process-wide keep-alive session so consecutive syncs reuse the SAIBA connection"""
+	global _session
+	if _session is None:
+		with _session_lock:
+			if _session is None:
+				session = requests.Session()
+				session.headers.update({"Content-Type": "application/json"})
+				# Only connection failures are retried: a POST that reached SAIBA may have been saved
+				retry = Retry(total=2, connect=2, read=False, status=0, backoff_factor=0.2)
+				adapter = HTTPAdapter(pool_connections=4, pool_maxsize=32, max_retries=retry)
+				# SAIBA deployments are reached over plain HTTP as well as HTTPS
+				session.mount("http://", adapter)
+				session.mount("https://", adapter)
+				_session = session
+	return _session
 
 
 class SaibaSyncService:
@@ -20,13 +233,22 @@ class SaibaSyncService:
 	# Token validity duration (23 hours to be safe)
 	TOKEN_VALIDITY_HOURS = 23
 
+	# Upper bound on policies handled by one bulk sync call, and on its concurrent POSTs
+	SYNC_BATCH_SIZE = 50
+	SYNC_MAX_WORKERS = 8
+
+	# Redis lists holding policies queued for the background sync drain
+	SYNC_QUEUE_KEYS = {"Motor Policy": "saiba:motor:queue", "Health Policy": "saiba:health:queue"}
+
 	def __init__(self):
 		self.settings = None
+		# While a bulk sync runs, status writes are collected here ({doctype: {name: values}})
+		self._deferred_status_updates = None
 		self._load_settings()
 
 	def _load_settings(self):
-		"""Load Policy Reader Settings"""
-		self.settings = frappe.get_single("Policy Reader Settings")
+		"""Load Policy Reader Settings from the document cache"""
+		self.settings = frappe.get_cached_doc("Policy Reader Settings")
 
 	def _is_enabled(self):
 		"""Check if SAIBA integration is enabled"""
@@ -36,25 +258,32 @@ class SaibaSyncService:
 		"""Get SAIBA API base URL"""
 		return (self.settings.saiba_base_url or "").rstrip("/")
 
-	def _is_token_valid(self):
-		"""Check if the cached token is still valid"""
-		if not self.settings.saiba_token or not self.settings.saiba_token_expiry:
-			return False
-
+	def _refresh_token(self, min_ttl=0):
+		"""
+		Refresh the authentication token, one worker at a time
+
+		Workers that waited on the lock reuse the token the holder just cached
+		instead of each requesting their own, as long as it still has more than
+		`min_ttl` seconds to live.
+		"""
+		cache = frappe.cache()
+		lock = cache.lock(cache.make_key(SAIBA_TOKEN_REFRESH_LOCK), timeout=TOKEN_REFRESH_LOCK_TIMEOUT)
+		acquired = lock.acquire(blocking_timeout=TOKEN_REFRESH_LOCK_TIMEOUT)
 		try:
-			expiry = self.settings.saiba_token_expiry
-			if isinstance(expiry, str):
-				expiry = datetime.fromisoformat(expiry.replace("Z", "+00:00"))
-
-			# Check if token expires within next 5 minutes
-			buffer_time = datetime.now() + timedelta(minutes=5)
-			return expiry > buffer_time
-		except Exception as e:
-			frappe.log_error(f"Error checking token validity: {str(e)}", "SAIBA Token Check Error")
-			return False
-
-	def _refresh_token(self):
-		"""Refresh the authentication token from SAIBA API"""
+			token = cache.get_value(SAIBA_TOKEN_CACHE_KEY)
+			if token and (not min_ttl or self._token_ttl() > min_ttl):
+				return token
+			return self._request_token()
+		finally:
+			if acquired:
+				try:
+					lock.release()
+				except Exception:
+					# The lock already expired; nothing to release
+					pass
+
+	def _request_token(self):
+		"""Request a new authentication token from SAIBA API"""
 		if not self._is_enabled():
 			frappe.throw("SAIBA integration is not enabled")
 
@@ -71,9 +300,7 @@ class SaibaSyncService:
 		try:
 			url = f"{base_url}{self.TOKEN_ENDPOINT}"
 			payload = {"userName": username, "password": password}
-			response = requests.post(
-				url, json=payload, headers={"Content-Type": "application/json"}, timeout=30
-			)
+			response = _get_session().post(url, json=payload, timeout=30)
 			if response.status_code == 200:
 				data = response.json()
 				token = data.get("token") or data.get("access_token") or data.get("Token")
@@ -95,39 +322,37 @@ class SaibaSyncService:
 			frappe.throw(f"Failed to refresh token: {str(e)}")
 
 	def _cache_token(self, token):
-		"""Cache the token in settings"""
-		expiry = datetime.now() + timedelta(hours=self.TOKEN_VALIDITY_HOURS)
-
-		# Update settings directly in DB to avoid validation
-		frappe.db.set_value(
-			"Policy Reader Settings",
-			"Policy Reader Settings",
-			{"saiba_token": token, "saiba_token_expiry": expiry},
-			update_modified=False,
+		"""Cache the token in Redis until shortly before it expires"""
+		frappe.cache().set_value(
+			SAIBA_TOKEN_CACHE_KEY,
+			token,
+			expires_in_sec=int(timedelta(hours=self.TOKEN_VALIDITY_HOURS, minutes=-5).total_seconds()),
 		)
-		frappe.db.commit()
 
-		# Refresh settings instance
-		self._load_settings()
+	def _token_ttl(self):
+		"""Seconds until the cached token expires (negative when there is none)"""
+		cache = frappe.cache()
+		return cache.ttl(cache.make_key(SAIBA_TOKEN_CACHE_KEY))
+
+	def refresh_token_if_expiring(self):
+		"""Renew the token ahead of expiry so syncs do not pay for /GetToken inline"""
+		if not self._is_enabled() or not self._get_base_url():
+			return
+
+		if self._token_ttl() <= TOKEN_REFRESH_AHEAD:
+			self._refresh_token(min_ttl=TOKEN_REFRESH_AHEAD)
 
 	def _get_auth_token(self):
 		"""Get valid authentication token, refreshing if needed"""
-		if self._is_token_valid():
-			return self.settings.saiba_token
+		token = frappe.cache().get_value(SAIBA_TOKEN_CACHE_KEY)
+		if token:
+			return token
 
 		return self._refresh_token()
 
 	def _format_date_for_saiba(self, date_value):
 		"""Format date to DD-MM-YYYY for SAIBA API"""
-		if not date_value:
-			return ""
-
-		try:
-			if isinstance(date_value, str):
-				date_value = getdate(date_value)
-			return date_value.strftime("%d-%m-%Y")
-		except Exception:
-			return ""
+		return _format_saiba_date(date_value)
 
 	def _safe_int(self, value, default=0):
 		"""Safely convert value to int"""
@@ -154,16 +379,28 @@ class SaibaSyncService:
 		return cstr(value)
 
 	def _get_required_saiba_fields(self, policy_type):
-		"""Get set of required SAIBA field names from validation rules"""
+		"""Get set of required SAIBA field names from validation rules (cached)"""
+		policy_type = "motor" if policy_type.lower() == "motor" else "health"
+		cache_key = REQUIRED_FIELDS_CACHE_KEY.format(policy_type)
+
+		cached_fields = frappe.cache().get_value(cache_key)
+		if cached_fields is not None:
+			return frozenset(cached_fields)
+
 		try:
 			validation_settings = frappe.get_single("SAIBA Validation Settings")
-			if policy_type.lower() == "motor":
+			if policy_type == "motor":
 				rules = validation_settings.motor_validation_rules or []
 			else:
 				rules = validation_settings.health_validation_rules or []
-			return {r.saiba_field for r in rules if r.is_required}
+			required_fields = frozenset(r.saiba_field for r in rules if r.is_required)
 		except Exception:
-			return set()
+			return frozenset()
+
+		frappe.cache().set_value(
+			cache_key, sorted(required_fields), expires_in_sec=REQUIRED_FIELDS_CACHE_TTL
+		)
+		return required_fields
 
 	# def _validate_bank_master(self, policy_doc):
 	# 	bank_name = self._safe_str(policy_doc.bank_name)
@@ -212,115 +449,44 @@ class SaibaSyncService:
 				detected.append(FIELD_MAP[first_word])
 		return detected
 
+	def _load_payload_source(self, doctype, policy_name, fields):
+		"""Fetch the payload columns of a policy as a _dict that passes for the document"""
+		policy_doc = frappe.db.get_value(doctype, policy_name, list(fields), as_dict=True)
+		if not policy_doc:
+			raise frappe.DoesNotExistError(f"{doctype} {policy_name} not found")
+		policy_doc.doctype = doctype
+		return policy_doc
+
 	def _build_motor_policy_payload(self, policy_doc):
 		"""Build the payload for Motor Policy sync"""
-		return {
-			"custCode": self._safe_int(policy_doc.customer_code),
-			"posPolicy": self._safe_str(policy_doc.pos_misp_ref) or "No",
-			"bizType": self._safe_str(policy_doc.biz_type) or "New",
-			"insBranchCode": self._safe_int(policy_doc.insurer_branch_code),
-			"issuenceDate": self._format_date_for_saiba(policy_doc.policy_issuance_date),
-			"busBrokDate": self._format_date_for_saiba(
-				policy_doc.bus_brok_date or policy_doc.policy_issuance_date
-			),
-			"startDate": self._format_date_for_saiba(policy_doc.policy_start_date),
-			"expiryDate": self._format_date_for_saiba(policy_doc.policy_expiry_date),
-			"policyReceivedDate": self._format_date_for_saiba(policy_doc.receive_date),
-			"policyReceivedFormat": self._safe_str(policy_doc.policy_received_format),
-			"policyType": self._safe_str(policy_doc.policy_type),
-			"department": self._safe_str(policy_doc.department),
-			"coverageType": self._safe_str(policy_doc.coverage_type) or "1+1",
-			"policyVertical": self._safe_str(policy_doc.customer_vertical),
-			"policyNo": self._safe_str(policy_doc.policy_no),
-			"isRenewable": "Yes" if policy_doc.is_renewable == "YES" else "No",
-			"newRenewal": self._safe_str(policy_doc.new_renewal) or "New",
-			"prevPolicy": self._safe_str(policy_doc.prev_policy) or "No",
-			"vehicleNo": self._safe_str(policy_doc.vehicle_no),
-			"make": self._safe_str(policy_doc.make),
-			"model": self._safe_str(policy_doc.model),
-			"variant": self._safe_str(policy_doc.variant),
-			"registrationDate": self._format_date_for_saiba(
-				policy_doc.registration_date or policy_doc.policy_start_date
-			),
-			"typeofVehicle": self._safe_str(policy_doc.type_of_vehicle) or "Private",
-			"yearOfMan": self._safe_int(policy_doc.year_of_man),
-			"chasisNo": self._safe_str(policy_doc.chasis_no),
-			"engineNo": self._safe_str(policy_doc.engine_no),
-			"cc": self._safe_str(policy_doc.cc),
-			"seat": self._safe_str(policy_doc.seats),
-			"fuel": self._safe_str(policy_doc.fuel),
-			"rtocode": self._safe_str(policy_doc.rto_code),
-			"ncb": self._safe_int(policy_doc.ncb),
-			"odd": self._safe_int(policy_doc.odd),
-			"vehicleCategory": self._safe_str(policy_doc.category) or "PCV",
-			"passengerGVW": self._safe_str(policy_doc.passenger_gvw),
-			"gvw": self._safe_str(policy_doc.gvw_ton_kg),
-			"noOfPassenger": self._safe_str(policy_doc.no_of_passenger),
-			"sumInsured": self._safe_int(policy_doc.sum_insured),
-			"odPremium": self._safe_int(policy_doc.net_od_premium),
-			"premRate": self._safe_str(policy_doc.prem_rate),
-			"tpPremium": self._safe_int(policy_doc.tp_premium),
-			"lpodPremium": self._safe_int(policy_doc.lpod_premium),
-			"coverangeOrTP": self._safe_str(policy_doc.coverage_tp),
-			"gst": self._safe_int(policy_doc.gst) or 18,
-			"stampDuty": self._safe_int(policy_doc.stamp_duty),
-			"paymentMode": self._safe_str(policy_doc.payment_mode_1),
-			"bankName": self._safe_str(policy_doc.bank_name),
-			"paymentTranNo": self._safe_str(policy_doc.payment_tran_no),
-			"campaignName": self._safe_str(policy_doc.campaign_name) or "No Campaign",
-			"remarks": self._safe_str(policy_doc.policy_enquiry_remarks),
-			"policyStatus": self._safe_str(policy_doc.policy_status_na) or "NA",
-		}
+		return self._apply_payload_spec(policy_doc, _MOTOR_PAYLOAD_SPEC)
+
+	def _apply_payload_spec(self, policy_doc, spec):
+		"""Build a SAIBA payload from a (key, sources, converter, fallback) spec"""
+		get = policy_doc.get
+		payload = {}
+		for key, sources, convert, fallback in spec:
+			value = get(sources[0])
+			if not value and len(sources) > 1:
+				value = get(sources[1])
+			value = convert(value)
+			payload[key] = value if fallback is None else (value or fallback)
+		return payload
 
 	def _build_health_policy_payload(self, policy_doc):
 		"""Build the payload for Health Policy sync"""
 		# bank_name = self._validate_bank_master(policy_doc)
-		payload = {
-			# "customerCode": self._safe_int(policy_doc.customer_code),
-			"CustCode": self._safe_int(policy_doc.customer_code),
-			"posPolicy": self._safe_str(policy_doc.pos_policy) or "No",
-			# "policyBizType": self._safe_str(policy_doc.biz_type) or "New",
-			"bizType":self._safe_str(policy_doc.biz_type) or "New",
-			"insurerBranchCode": self._safe_int(policy_doc.insurer_branch_code),
-			# "policyIssuanceDate": self._format_date_for_saiba(policy_doc.policy_issuance_date),
-			"issuenceDate": self._format_date_for_saiba(policy_doc.policy_issuance_date),
-			# "policyStartDate": self._format_date_for_saiba(policy_doc.policy_start_date),
-			"startDate": self._format_date_for_saiba(policy_doc.policy_start_date),
-			# "policyExpiryDate": self._format_date_for_saiba(policy_doc.policy_expiry_date),
-			"expiryDate": self._format_date_for_saiba(policy_doc.policy_expiry_date),
-			"policyType": self._safe_str(policy_doc.policy_type),
-			"policyNo": self._safe_str(policy_doc.policy_no),
-			"planName": self._safe_str(policy_doc.plan_name),
-			"isRenewable": "Yes" if policy_doc.is_renewable == "Yes" else "No",
-			# "isRenewal":"New",
-			# "newRenewal": "Yes" if policy_doc.is_renewable == "Yes" else "No",
-			# "coverageType": self._safe_str(policy_doc.coverage_type),
-			# "policyVertical": self._safe_str(policy_doc.policy_vertical),
-			"prevPolicy": self._safe_str(policy_doc.prev_policy),
-			"sumInsured": self._safe_int(policy_doc.sum_insured),
-			"netodPremium": self._safe_int(policy_doc.net_od_premium),
-			"gst": self._safe_int(policy_doc.gst_tax_percent) or 18,
-			"stampDuty": self._safe_int(policy_doc.stamp_duty),
-			"paymentMode": self._safe_str(policy_doc.payment_mode),
-			"bankName": self._safe_str(policy_doc.bank_name),
-			# "paymentTransactionNo": self._safe_str(policy_doc.payment_transaction_no),
-			"paymentTranNo": self._safe_str(policy_doc.payment_transaction_no),
-			"Chq/DD/Trn No": self._safe_str(policy_doc.payment_transaction_no),
-			"remarks": self._safe_str(policy_doc.policy_enquiry_remarks),
-			"policyStatus": self._safe_str(policy_doc.policy_status),
-		}
+		payload = self._apply_payload_spec(policy_doc, _HEALTH_PAYLOAD_SPEC)
 
 		# Add insured persons (1-5 for SAIBA API)
-		for i in range(1, 6):
-			name_field = f"insured_{i}_name"
-			gender_field = f"insured_{i}_gender"
-			dob_field = f"insured_{i}_dob"
-			relation_field = f"insured_{i}_relation"
-
-			payload[f"insured{i}Name"] = self._safe_str(getattr(policy_doc, name_field, ""))
-			payload[f"insured{i}Gender"] = self._safe_str(getattr(policy_doc, gender_field, ""))
-			payload[f"insured{i}DOB"] = self._format_date_for_saiba(getattr(policy_doc, dob_field, None))
-			payload[f"insured{i}Relation"] = self._safe_str(getattr(policy_doc, relation_field, ""))
+		get = policy_doc.get
+		for name_field, name_key, gender_field, gender_key, dob_field, dob_key, relation_field, relation_key in (
+			_INSURED_FIELDS
+		):
+			payload[name_key] = self._safe_str(get(name_field))
+			payload[gender_key] = self._safe_str(get(gender_field))
+			payload[dob_key] = self._format_date_for_saiba(get(dob_field))
+			payload[relation_key] = self._safe_str(get(relation_field))
 		return payload
 
 	def _build_customer_payload(self, customer_doc):
@@ -359,27 +525,23 @@ class SaibaSyncService:
 		url = f"{base_url}{endpoint}"
 		token = self._get_auth_token()
 
-		headers = {"Content-Type": "application/json", "Authorization": f"Bearer {token}"}
+		headers = {"Authorization": f"Bearer {token}"}
+		session = _get_session()
+		# Serialised once; the token retry below resends the same bytes
+		body = _dumps(payload)
 
 		try:
-			response = requests.post(url, json=payload, headers=headers, timeout=60)
+			response = session.post(url, data=body, headers=headers, timeout=60)
 			# Handle 401/403 - try refreshing token once
 			if response.status_code in [401, 403]:
 				# Clear token and retry
-				frappe.db.set_value(
-					"Policy Reader Settings",
-					"Policy Reader Settings",
-					{"saiba_token": None, "saiba_token_expiry": None},
-					update_modified=False,
-				)
-				frappe.db.commit()
-				self._load_settings()
+				frappe.cache().delete_value(SAIBA_TOKEN_CACHE_KEY)
 
 				# Get new token and retry
 				token = self._refresh_token()
 				headers["Authorization"] = f"Bearer {token}"
 
-				response = requests.post(url, json=payload, headers=headers, timeout=60)
+				response = session.post(url, data=body, headers=headers, timeout=60)
 
 			return response
 
@@ -393,7 +555,7 @@ class SaibaSyncService:
 		if not result_text:
 			return None
 
-		match = re.search(r"Control No\s*:\s*(\d+)", result_text, re.IGNORECASE)
+		match = _CONTROL_NO_RE.search(result_text)
 		return match.group(1) if match else None
 
 	# def _parse_customer_code(self,result_text):
@@ -403,7 +565,7 @@ class SaibaSyncService:
 	# 	match=re.search(r"customer Code\s*:\s*(\d+)", result_text, re.IGNORECASE)
 	# 	return match.group(1) if match else None
 
-	def _handle_api_response(self, response, policy_doc, request_payload=None):
+	def _handle_api_response(self, response, policy_doc, request_payload=None, commit=True):
 		"""Handle API response and update sync status"""
 		try:
 			data = response.json()
@@ -433,6 +595,7 @@ class SaibaSyncService:
 				customer_code=customer_code,
 				response=data,
 				request_payload=request_payload,
+				commit=commit,
 			)
 			return {
 				"success": True,
@@ -455,11 +618,7 @@ class SaibaSyncService:
 				error_text = str(error_msg)
 
 			# Google-Sheet-style regex usage
-			match = re.search(
-				r"policy\s*no.*already\s*exists\s*in\s*saiba.*control\s*no\s*:\s*(\d+)",
-				error_text,
-				re.IGNORECASE,
-			)
+			match = _DUPLICATE_POLICY_RE.search(error_text)
 
 			if match:
 				control_no = match.group(1)
@@ -471,6 +630,7 @@ class SaibaSyncService:
 					error=error_text,
 					response=data,
 					request_payload=request_payload,
+					commit=commit,
 				)
 
 				return {
@@ -486,6 +646,7 @@ class SaibaSyncService:
 				error=str(error_msg),
 				response=data,
 				request_payload=request_payload,
+				commit=commit,
 			)
 			# return {"success": False, "error": str(error_msg)}
 			validations = data.get("validations", [])
@@ -505,8 +666,14 @@ class SaibaSyncService:
 		response=None,
 		request_payload=None,
 		customer_code=None,
+		commit=False,
 	):
-		"""Update the sync status fields on the policy document"""
+		"""
+		Update the sync status fields on the policy document
+
+		Only terminal states pass commit=True; intermediate writes ride on the
+		request's (or batch's) own commit.
+		"""
 		doctype = policy_doc.doctype
 		docname = policy_doc.name
 
@@ -522,79 +689,250 @@ class SaibaSyncService:
 		if customer_code:
 			update_data["saiba_customer_code"] = customer_code
 
-		# Store both request and response for debugging
-		if response or request_payload:
+		# Store both request and response for debugging: always for failures, for
+		# successful syncs only when payload logging is switched on
+		if status == "Synced" and not cint(self.settings.get("saiba_debug_log")):
+			update_data["saiba_sync_response"] = None
+		elif response or request_payload:
 			sync_data = {}
 			if request_payload:
 				sync_data["request"] = request_payload
 			if response:
 				sync_data["response"] = response
-			update_data["saiba_sync_response"] = frappe.as_json(sync_data)
+			update_data["saiba_sync_response"] = _dumps(sync_data).decode("utf-8")
+
+		if self._deferred_status_updates is not None:
+			self._deferred_status_updates.setdefault(doctype, {})[docname] = update_data
+			return
 
 		frappe.db.set_value(doctype, docname, update_data, update_modified=False)
-		frappe.db.commit()
+		if commit:
+			frappe.db.commit()
+
+	def _bulk_update_sync_status(self, doctype, updates):
+		"""
+		Write collected sync statuses for many documents in one UPDATE
+
+		`updates` maps document name to the values _update_sync_status built. Each
+		column is set with a CASE on name; documents that do not carry a column keep
+		their current value.
+		"""
+		if not updates:
+			return
+
+		columns = [field for field in _SYNC_STATUS_FIELDS if any(field in row for row in updates.values())]
+		unknown = {field for row in updates.values() for field in row} - set(_SYNC_STATUS_FIELDS)
+		if unknown:
+			frappe.throw(f"Unsupported sync status fields: {', '.join(sorted(unknown))}")
+
+		assignments = []
+		values = []
+		for column in columns:
+			cases = []
+			for name, row in updates.items():
+				if column in row:
+					cases.append("WHEN %s THEN %s")
+					values.extend((name, row[column]))
+			assignments.append(f"`{column}` = CASE `name` {' '.join(cases)} ELSE `{column}` END")
+
+		names = list(updates)
+		values.extend(names)
+		frappe.db.sql(
+			f"UPDATE `tab{doctype}` SET {', '.join(assignments)} "
+			f"WHERE `name` IN ({', '.join(['%s'] * len(names))})",
+			values,
+		)
 
-	def sync_motor_policy(self, policy_name):
+	def sync_motor_policy(self, policy_name, commit=True):
 		"""Sync a Motor Policy to SAIBA"""
+		return self._sync_policy("Motor Policy", policy_name, commit=commit)
+
+	def sync_health_policy(self, policy_name, commit=True):
+		"""Sync a Health Policy to SAIBA"""
+		return self._sync_policy("Health Policy", policy_name, commit=commit)
+
+	def _sync_target(self, doctype):
+		"""(policy type, endpoint, payload columns, payload builder) for a policy DocType"""
+		if doctype == "Motor Policy":
+			return "Motor", self.MOTOR_ENDPOINT, MOTOR_PAYLOAD_FIELDS, self._build_motor_policy_payload
+		return "Health", self.HEALTH_ENDPOINT, HEALTH_PAYLOAD_FIELDS, self._build_health_policy_payload
+
+	def _sync_policy(self, doctype, policy_name, commit=True):
+		"""Build, send and record the SAIBA sync of one Motor/Health policy"""
 		if not self._is_enabled():
 			return {"success": False, "error": "SAIBA integration is not enabled"}
 
 		payload = None
 		try:
-			policy_doc = frappe.get_doc("Motor Policy", policy_name)
-			# Build payload
-			payload = self._build_motor_policy_payload(policy_doc)
-			payload = self._filter_required_only(payload, "Motor")
+			policy_doc, payload = self._prepare_sync(doctype, policy_name)
 			# Make API request
-			response = self._make_api_request(self.MOTOR_ENDPOINT, payload)
+			response = self._make_api_request(self._sync_target(doctype)[1], payload)
 			# Handle response (pass payload for debugging)
-			return self._handle_api_response(response, policy_doc, request_payload=payload)
+			return self._handle_api_response(response, policy_doc, request_payload=payload, commit=commit)
 
 		except Exception as e:
-			frappe.log_error(f"Motor Policy sync error: {str(e)}", "SAIBA Sync Error")
+			return self._fail_sync(doctype, policy_name, e, payload, commit=commit)
 
-			# Try to update status if we have the doc
-			try:
-				policy_doc = frappe.get_doc("Motor Policy", policy_name)
-				self._update_sync_status(policy_doc, status="Failed", error=str(e), request_payload=payload)
-			except Exception:
-				pass
+	def _prepare_sync(self, doctype, policy_name):
+		"""Load a policy's payload columns and build its (filtered) SAIBA payload"""
+		policy_type, _endpoint, fields, build_payload = self._sync_target(doctype)
+		policy_doc = self._load_payload_source(doctype, policy_name, fields)
+		payload = self._filter_required_only(build_payload(policy_doc), policy_type)
+		return policy_doc, payload
 
-			return {"success": False, "error": str(e)}
+	def _fail_sync(self, doctype, policy_name, error, payload, commit=True):
+		"""Log a sync failure and record it on the policy"""
+		frappe.log_error(f"{doctype} sync error: {str(error)}", "SAIBA Sync Error")
 
-	def sync_health_policy(self, policy_name):
-		"""Sync a Health Policy to SAIBA"""
+		# Try to update status if we have the doc
+		try:
+			policy_doc = frappe._dict(doctype=doctype, name=policy_name)
+			self._update_sync_status(
+				policy_doc, status="Failed", error=str(error), request_payload=payload, commit=commit
+			)
+		except Exception:
+			pass
+
+		return {"success": False, "error": str(error)}
+
+	def sync_motor_policies(self, policy_names):
+		"""Sync several Motor Policies, sharing one settings load, token and connection pool"""
+		return self._sync_policies("Motor Policy", policy_names)
+
+	def sync_health_policies(self, policy_names):
+		"""Sync several Health Policies, sharing one settings load, token and connection pool"""
+		return self._sync_policies("Health Policy", policy_names)
+
+	def _sync_policies(self, doctype, policy_names):
+		"""
+		Sync a batch of policies and collect the per-policy results
+
+		SAIBA's entry endpoints accept a single policy per request, so payloads are
+		built here, then up to SYNC_MAX_WORKERS POSTs run concurrently on the shared
+		session. Database reads and writes stay on this thread.
+		"""
 		if not self._is_enabled():
 			return {"success": False, "error": "SAIBA integration is not enabled"}
 
-		payload = None
+		if isinstance(policy_names, str):
+			policy_names = frappe.parse_json(policy_names)
+
+		# Preserve order, drop duplicates
+		policy_names = list(dict.fromkeys(policy_names or []))
+		if len(policy_names) > self.SYNC_BATCH_SIZE:
+			frappe.throw(f"Cannot sync more than {self.SYNC_BATCH_SIZE} policies at once")
+
+		# Status writes are collected and flushed as one UPDATE and one commit for the batch
+		self._deferred_status_updates = {}
 		try:
-			policy_doc = frappe.get_doc("Health Policy", policy_name)
+			# Fetch (or refresh) the token once up front instead of per policy
+			token = self._get_auth_token()
+			endpoint = self._sync_target(doctype)[1]
+			url = f"{self._get_base_url()}{endpoint}"
+			headers = {"Authorization": f"Bearer {token}"}
+
+			results = {}
+			prepared = []
+			for policy_name in policy_names:
+				try:
+					policy_doc, payload = self._prepare_sync(doctype, policy_name)
+					prepared.append((policy_name, policy_doc, payload))
+				except Exception as e:
+					results[policy_name] = self._fail_sync(doctype, policy_name, e, None, commit=False)
+
+			responses = []
+			if prepared:
+				with ThreadPoolExecutor(max_workers=min(self.SYNC_MAX_WORKERS, len(prepared))) as executor:
+					responses = list(
+						executor.map(
+							lambda job: _post_or_error(url, _dumps(job[2]), headers),
+							prepared,
+						)
+					)
+
+			for (policy_name, policy_doc, payload), response in zip(prepared, responses):
+				try:
+					if isinstance(response, requests.exceptions.Timeout):
+						raise Exception("SAIBA API request timed out")
+					if isinstance(response, requests.exceptions.ConnectionError):
+						raise Exception("Could not connect to SAIBA API")
+					if isinstance(response, Exception):
+						raise response
+					if response.status_code in (401, 403):
+						# Token rejected mid-batch: retry this one through the refreshing path
+						response = self._make_api_request(endpoint, payload)
+					results[policy_name] = self._handle_api_response(
+						response, policy_doc, request_payload=payload, commit=False
+					)
+				except Exception as e:
+					results[policy_name] = self._fail_sync(doctype, policy_name, e, payload, commit=False)
+
+			# Report in the order the names were given
+			results = {name: results[name] for name in policy_names}
+		finally:
+			deferred, self._deferred_status_updates = self._deferred_status_updates, None
+			self._bulk_update_sync_status(doctype, deferred.get(doctype))
+			frappe.db.commit()
+		synced = sum(1 for result in results.values() if result.get("success"))
+		return {
+			"success": synced == len(results),
+			"synced": synced,
+			"failed": len(results) - synced,
+			"results": results,
+		}
 
-			# Mark as pending
-			self._update_sync_status(policy_doc, status="Pending")
+	def queue_sync(self, doctype, policy_name):
+		"""Queue a policy for the background SAIBA drain instead of syncing inline"""
+		if not self._is_enabled():
+			return {"success": False, "error": "SAIBA integration is not enabled"}
 
-			# Build payload
-			payload = self._build_health_policy_payload(policy_doc)
-			payload = self._filter_required_only(payload, "Health")
+		policy_doc = frappe.get_doc(doctype, policy_name)
+		self._update_sync_status(policy_doc, status="Pending")
+		frappe.cache().rpush(self.SYNC_QUEUE_KEYS[doctype], policy_name)
+		return {"success": True, "queued": True}
 
-			# Make API request
-			response = self._make_api_request(self.HEALTH_ENDPOINT, payload)
+	def drain_sync_queues(self):
+		"""
+		Pop up to SYNC_BATCH_SIZE queued policies per type and sync each batch
 
-			# Handle response (pass payload for debugging)
-			return self._handle_api_response(response, policy_doc, request_payload=payload)
+		If a batch fails as a whole (for example /GetToken is unreachable), its names
+		are pushed back to the head of the queue in their original order so the next
+		drain retries them instead of losing them.
+		"""
+		if not self._is_enabled():
+			return
 
-		except Exception as e:
-			frappe.log_error(f"Health Policy sync error: {str(e)}", "SAIBA Sync Error")
+		sync_batch = {"Motor Policy": self.sync_motor_policies, "Health Policy": self.sync_health_policies}
+		cache = frappe.cache()
+		for doctype, queue_key in self.SYNC_QUEUE_KEYS.items():
+			policy_names = []
+			while len(policy_names) < self.SYNC_BATCH_SIZE:
+				policy_name = cache.lpop(queue_key)
+				if policy_name is None:
+					break
+				policy_names.append(frappe.safe_decode(policy_name))
+
+			if not policy_names:
+				continue
 
-			# Try to update status if we have the doc
 			try:
-				policy_doc = frappe.get_doc("Health Policy", policy_name)
-				self._update_sync_status(policy_doc, status="Failed", error=str(e), request_payload=payload)
+				result = sync_batch[doctype](policy_names)
 			except Exception:
-				pass
+				for policy_name in reversed(policy_names):
+					cache.lpush(queue_key, policy_name)
+				frappe.log_error(
+					f"SAIBA queue drain for {doctype} failed; {len(policy_names)} policies requeued\n\n"
+					f"{frappe.get_traceback()}",
+					"SAIBA Sync Error",
+				)
+				continue
 
-			return {"success": False, "error": str(e)}
+			frappe.logger().info(
+				"SAIBA queue drain for %s: %s synced, %s failed",
+				doctype,
+				result.get("synced"),
+				result.get("failed"),
+			)
 
 	def sync_customer_details(self, doc):
 		if not self._is_enabled():
@@ -603,16 +941,16 @@ class SaibaSyncService:
 		payload = None
 		try:
 			policy_doc = frappe.get_doc("Insurance Customer", doc)
-			self._update_sync_status(policy_doc, status="Pending")
-			# need to update the status
 			payload = self._build_customer_payload(policy_doc)
 			response = self._make_api_request(self.CUSTOMER_ENDPOINT, payload)
 			return self._handle_api_response(response, policy_doc, request_payload=payload)
 		except Exception as e:
 			frappe.log_error(f"Customer Insertion error :{str(e)}", "SAIBA sync error")
 			try:
-				policy_doc = frappe.get_doc("Insurance Customer", policy_doc)
-				self._update_sync_status(policy_doc, status="Failed", error=str(e), request_payload=payload)
+				policy_doc = frappe.get_doc("Insurance Customer", doc)
+				self._update_sync_status(
+					policy_doc, status="Failed", error=str(e), request_payload=payload, commit=True
+				)
 			except Exception:
 				pass
 
@@ -641,19 +979,37 @@ class SaibaSyncService:
 
 # Whitelisted API methods
 @frappe.whitelist()
-def sync_motor_policy(policy_name):
-	"""Whitelisted method to sync a Motor Policy to SAIBA"""
+def sync_motor_policy(policy_name, sync_now=True):
+	"""Whitelisted method to sync a Motor Policy to SAIBA (sync_now=0 queues it instead)"""
 	service = SaibaSyncService()
+	if not cint(sync_now):
+		return service.queue_sync("Motor Policy", policy_name)
 	return service.sync_motor_policy(policy_name)
 
 
 @frappe.whitelist()
-def sync_health_policy(policy_name):
-	"""Whitelisted method to sync a Health Policy to SAIBA"""
+def sync_health_policy(policy_name, sync_now=True):
+	"""Whitelisted method to sync a Health Policy to SAIBA (sync_now=0 queues it instead)"""
 	service = SaibaSyncService()
+	if not cint(sync_now):
+		return service.queue_sync("Health Policy", policy_name)
 	return service.sync_health_policy(policy_name)
 
 
+@frappe.whitelist()
+def sync_motor_policies(policy_names):
+	"""Whitelisted method to sync several Motor Policies to SAIBA (JSON list of names)"""
+	service = SaibaSyncService()
+	return service.sync_motor_policies(policy_names)
+
+
+@frappe.whitelist()
+def sync_health_policies(policy_names):
+	"""Whitelisted method to sync several Health Policies to SAIBA (JSON list of names)"""
+	service = SaibaSyncService()
+	return service.sync_health_policies(policy_names)
+
+
 @frappe.whitelist()
 def test_saiba_connection():
 	"""Whitelisted method to test SAIBA API connectivity"""
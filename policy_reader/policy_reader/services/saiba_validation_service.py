@@ -1,12 +1,177 @@
 # Copyright (c) 2026, Clapgrow Software and contributors
 # For license information, please see license.txt
 
+import functools
+from collections import namedtuple
+
 import frappe
-from frappe.utils import cint, flt, getdate
+from frappe.utils import cint, cstr, flt, getdate
 
 from policy_reader.policy_reader.services.common_service import CommonService
 from policy_reader.policy_reader.services.policy_creation_service import PolicyCreationService
 
+# Cached copy of SAIBA Validation Settings.enabled, cleared by the settings controller
+VALIDATION_ENABLED_CACHE_KEY = "saiba_validation:enabled"
+VALIDATION_ENABLED_CACHE_TTL = 300
+
+_YES_NO = frozenset({"YES", "NO"})
+_NEW_RENEW = frozenset({"new", "renewal"})
+_GCV_PCV_MISC = frozenset({"GCV", "PCV", "MISC", "MISC.", "GSV"})
+
+
+def _is_blank(value):
+	"""True for None and empty or whitespace-only values"""
+	if value is None:
+		return True
+	if isinstance(value, str):
+		return not value.strip()
+	return not str(value).strip()
+
+
+def _v_passthrough(value):
+	# Unknown validation type - treat as valid
+	return True, None
+
+
+def _v_string(value):
+	# Non-empty string required
+	if _is_blank(value):
+		return False, "Required"
+	return True, None
+
+
+def _v_integer(value):
+	# Any integer (including 0) is valid, but must be set
+	if value is None or value == "":
+		return False, "Required"
+	try:
+		cint(value)
+		return True, None
+	except (ValueError, TypeError):
+		return False, "Must be a number"
+
+
+def _v_integer_nonzero(value):
+	# Non-zero integer required
+	if value is None or value == "":
+		return False, "Required"
+	try:
+		if cint(value) == 0:
+			return False, "Must be non-zero"
+		return True, None
+	except (ValueError, TypeError):
+		return False, "Must be a number"
+
+
+def _v_integer_positive(value):
+	# Positive integer required (> 0)
+	if value is None or value == "":
+		return False, "Required"
+	try:
+		if cint(value) <= 0:
+			return False, "Must be greater than 0"
+		return True, None
+	except (ValueError, TypeError):
+		return False, "Must be a number"
+
+
+def _v_date(value):
+	# Valid date required
+	if value is None or value == "":
+		return False, "Required"
+	try:
+		getdate(value)
+		return True, None
+	except Exception:
+		return False, "Invalid date"
+
+
+def _one_of(choices, normalize, message):
+	"""Build a validator accepting values whose normalized form is in `choices`"""
+
+	def validator(value):
+		if _is_blank(value):
+			return False, "Required"
+		if normalize(str(value)) not in choices:
+			return False, message
+		return True, None
+
+	return validator
+
+
+_VALIDATORS = {
+	"string": _v_string,
+	"integer": _v_integer,
+	"integer_nonzero": _v_integer_nonzero,
+	"integer_positive": _v_integer_positive,
+	"date": _v_date,
+	"yes_no": _one_of(_YES_NO, str.upper, "Must be Yes or No"),
+	"new_renew": _one_of(_NEW_RENEW, str.lower, "Must be New or Renewal"),
+	"gcv_pcv_misc": _one_of(_GCV_PCV_MISC, str.upper, "Must be GCV, PCV, or Misc"),
+}
+
+
+def _f_text(value):
+	if value is None or value == "":
+		return "Not Set"
+	return str(value)
+
+
+def _f_date(value):
+	if value is None or value == "":
+		return "Not Set"
+	try:
+		return getdate(value).strftime("%d-%m-%Y")
+	except Exception:
+		return str(value)
+
+
+def _f_integer(value):
+	if value is None or value == "":
+		return "Not Set"
+	try:
+		return str(cint(value))
+	except Exception:
+		return str(value)
+
+
+_FORMATTERS = {
+	"date": _f_date,
+	"integer": _f_integer,
+	"integer_nonzero": _f_integer,
+	"integer_positive": _f_integer,
+}
+
+# A required rule with its validator and display formatter already resolved
+ValidationPlan = namedtuple(
+	"ValidationPlan", ("doctype_field", "validator", "formatter", "label", "saiba_field", "category")
+)
+
+
+@functools.lru_cache(maxsize=32)
+def _load_rules(site, policy_type, settings_modified):
+	"""
+	Return the validation plan (required rules only) for a lowercased policy type.
+
+	Keyed on the site, since one worker process serves every site on the bench, and
+	on the settings' `modified` so every worker picks up saved changes; the settings
+	controller also clears this cache on update.
+	"""
+	settings = frappe.get_cached_doc("SAIBA Validation Settings")
+	rows = settings.get(f"{policy_type}_validation_rules") or []
+	return tuple(
+		ValidationPlan(
+			row.doctype_field,
+			_VALIDATORS.get(row.validation_type, _v_passthrough),
+			_FORMATTERS.get(row.validation_type, _f_text),
+			row.label,
+			row.saiba_field,
+			row.category,
+		)
+		for row in rows
+		if row.is_required
+	)
+
 
 class SaibaValidationService:
 	"""Service for validating policies before SAIBA sync"""
@@ -20,6 +185,7 @@ class SaibaValidationService:
 		"Financial",
 		"Dates",
 	]
+	_CATEGORY_INDEX = {name: index for index, name in enumerate(CATEGORY_ORDER)}
 
 	def __init__(self):
 		self._settings = None
@@ -28,27 +194,31 @@ class SaibaValidationService:
 	def settings(self):
 		"""Lazy load settings"""
 		if self._settings is None:
-			self._settings = frappe.get_single("SAIBA Validation Settings")
+			self._settings = frappe.get_cached_doc("SAIBA Validation Settings")
 		return self._settings
 
 	def is_enabled(self):
-		"""Check if validation feature is enabled"""
+		"""Check if validation feature is enabled (a Redis read when cached)"""
 		try:
-			return bool(self.settings.enabled)
+			enabled = frappe.cache().get_value(VALIDATION_ENABLED_CACHE_KEY)
+			if enabled is None:
+				enabled = cint(frappe.db.get_single_value("SAIBA Validation Settings", "enabled"))
+				frappe.cache().set_value(
+					VALIDATION_ENABLED_CACHE_KEY, enabled, expires_in_sec=VALIDATION_ENABLED_CACHE_TTL
+				)
+			return bool(enabled)
 		except Exception:
 			return False
 
 	def get_validation_rules(self, policy_type):
-		"""Fetch rules from motor_validation_rules or health_validation_rules table"""
+		"""Fetch required rules from motor_validation_rules or health_validation_rules table"""
 		if not self.is_enabled():
 			return []
 
 		policy_type_lower = (policy_type or "").lower()
 
-		if policy_type_lower == "motor":
-			return self.settings.motor_validation_rules or []
-		elif policy_type_lower == "health":
-			return self.settings.health_validation_rules or []
+		if policy_type_lower in ("motor", "health"):
+			return _load_rules(frappe.local.site, policy_type_lower, cstr(self.settings.modified))
 		else:
 			frappe.log_error(f"Unknown policy type: {policy_type}", "SAIBA Validation Error")
 			return []
@@ -59,102 +229,11 @@ class SaibaValidationService:
 
 		Returns tuple: (is_valid, error_message)
 		"""
-		if validation_type == "string":
-			# Non-empty string required
-			if value is None or str(value).strip() == "":
-				return False, "Required"
-			return True, None
-
-		elif validation_type == "integer":
-			# Any integer (including 0) is valid, but must be set
-			if value is None or value == "":
-				return False, "Required"
-			try:
-				cint(value)
-				return True, None
-			except (ValueError, TypeError):
-				return False, "Must be a number"
-
-		elif validation_type == "integer_nonzero":
-			# Non-zero integer required
-			if value is None or value == "":
-				return False, "Required"
-			try:
-				int_val = cint(value)
-				if int_val == 0:
-					return False, "Must be non-zero"
-				return True, None
-			except (ValueError, TypeError):
-				return False, "Must be a number"
-
-		elif validation_type == "integer_positive":
-			# Positive integer required (> 0)
-			if value is None or value == "":
-				return False, "Required"
-			try:
-				int_val = cint(value)
-				if int_val <= 0:
-					return False, "Must be greater than 0"
-				return True, None
-			except (ValueError, TypeError):
-				return False, "Must be a number"
-
-		elif validation_type == "date":
-			# Valid date required
-			if value is None or value == "":
-				return False, "Required"
-			try:
-				getdate(value)
-				return True, None
-			except Exception:
-				return False, "Invalid date"
-
-		elif validation_type == "yes_no":
-			# Must be Yes or No
-			if value is None or str(value).strip() == "":
-				return False, "Required"
-			if str(value).upper() not in ["YES", "NO"]:
-				return False, "Must be Yes or No"
-			return True, None
-
-		elif validation_type == "new_renew":
-			# Must be New or Renew
-			if value is None or str(value).strip() == "":
-				return False, "Required"
-			if str(value).lower() not in ["new", "renewal"]:
-				return False, "Must be New or Renewal"
-			return True, None
-
-		elif validation_type == "gcv_pcv_misc":
-			# Must be GCV, PCV, or Misc
-			if value is None or str(value).strip() == "":
-				return False, "Required"
-			if str(value).upper() not in ["GCV", "PCV", "MISC", "MISC.", "GSV"]:
-				return False, "Must be GCV, PCV, or Misc"
-			return True, None
-
-		# Unknown validation type - treat as valid
-		return True, None
+		return _VALIDATORS.get(validation_type, _v_passthrough)(value)
 
 	def format_display_value(self, value, validation_type):
 		"""Format a value for display in the validation modal"""
-		if value is None or value == "":
-			return "Not Set"
-
-		if validation_type == "date":
-			try:
-				date_val = getdate(value)
-				return date_val.strftime("%d-%m-%Y")
-			except Exception:
-				return str(value)
-
-		if validation_type in ["integer", "integer_nonzero", "integer_positive"]:
-			try:
-				return str(cint(value))
-			except Exception:
-				return str(value)
-
-		return str(value)
+		return _FORMATTERS.get(validation_type, _f_text)(value)
 
 	def validate_policy(self, policy_doc, policy_type):
 		"""
@@ -172,30 +251,24 @@ class SaibaValidationService:
 		valid_count = 0
 		invalid_count = 0
 
-		for rule in rules:
-			# Skip non-required fields for validation count
-			if not rule.is_required:
-				continue
-
+		for plan in rules:
 			# Get field value from policy document
-			value = getattr(policy_doc, rule.doctype_field, None)
-
-			# Validate field
-			is_valid, error_message = self.validate_field(value, rule.validation_type)
+			value = getattr(policy_doc, plan.doctype_field, None)
 
-			# Format display value
-			display_value = self.format_display_value(value, rule.validation_type)
+			# Validate field and format display value with the pre-resolved callables
+			is_valid, error_message = plan.validator(value)
+			display_value = plan.formatter(value)
 
 			# Add to category
-			category_name = rule.category
+			category_name = plan.category
 			if category_name not in categories:
 				categories[category_name] = []
 
 			categories[category_name].append(
 				{
-					"label": rule.label,
-					"saiba_field": rule.saiba_field,
-					"doctype_field": rule.doctype_field,
+					"label": plan.label,
+					"saiba_field": plan.saiba_field,
+					"doctype_field": plan.doctype_field,
 					"value": display_value,
 					"is_valid": is_valid,
 					"error": error_message,
@@ -207,16 +280,14 @@ class SaibaValidationService:
 			else:
 				invalid_count += 1
 
-		# Convert categories dict to ordered list
-		categories_list = []
-		for cat_name in self.CATEGORY_ORDER:
-			if cat_name in categories:
-				categories_list.append({"name": cat_name, "fields": categories[cat_name]})
-
-		# Add any categories not in the predefined order
-		for cat_name, fields in categories.items():
-			if cat_name not in self.CATEGORY_ORDER:
-				categories_list.append({"name": cat_name, "fields": fields})
+		# Convert categories dict to ordered list; categories outside CATEGORY_ORDER
+		# keep their first-seen order after the known ones (sorted is stable)
+		category_index = self._CATEGORY_INDEX
+		unordered = len(category_index)
+		categories_list = [
+			{"name": cat_name, "fields": categories[cat_name]}
+			for cat_name in sorted(categories, key=lambda name: category_index.get(name, unordered))
+		]
 
 		total_required = valid_count + invalid_count
 
@@ -239,11 +310,7 @@ class SaibaValidationService:
 			if not self.is_enabled():
 				return {"success": False, "error": "SAIBA validation is not enabled"}
 
-			if not frappe.db.exists("Motor Policy", policy_name):
-				return {"success": False, "error": f"Motor Policy '{policy_name}' not found"}
-
-			policy_doc = frappe.get_doc("Motor Policy", policy_name)
-			return self.validate_policy(policy_doc, "Motor")
+			return self._validate_stored_policy("Motor Policy", policy_name, "Motor")
 
 		except Exception as e:
 			frappe.log_error(f"Motor Policy validation error: {str(e)}", "SAIBA Validation Error")
@@ -255,16 +322,32 @@ class SaibaValidationService:
 			if not self.is_enabled():
 				return {"success": False, "error": "SAIBA validation is not enabled"}
 
-			if not frappe.db.exists("Health Policy", policy_name):
-				return {"success": False, "error": f"Health Policy '{policy_name}' not found"}
-
-			policy_doc = frappe.get_doc("Health Policy", policy_name)
-			return self.validate_policy(policy_doc, "Health")
+			return self._validate_stored_policy("Health Policy", policy_name, "Health")
 
 		except Exception as e:
 			frappe.log_error(f"Health Policy validation error: {str(e)}", "SAIBA Validation Error")
 			return {"success": False, "error": str(e)}
 
+	def _validate_stored_policy(self, doctype, policy_name, policy_type):
+		"""
+		Validate a saved policy by reading only the columns its rules reference.
+
+		Every validation type is a scalar check, so one get_value replaces loading
+		the full document with its child tables.
+		"""
+		rules = self.get_validation_rules(policy_type)
+		if not rules:
+			return self.validate_policy(frappe._dict(name=policy_name), policy_type)
+
+		columns = set(frappe.get_meta(doctype).get_valid_columns())
+		fields = ["name"] + sorted({plan.doctype_field for plan in rules if plan.doctype_field in columns})
+
+		row = frappe.db.get_value(doctype, policy_name, fields, as_dict=True)
+		if row is None:
+			return {"success": False, "error": f"{doctype} '{policy_name}' not found"}
+
+		return self.validate_policy(row, policy_type)
+
 	def get_saiba_ai_fields(self, policy_type):
 		# SAIBA-required fields (29-> motor and 25->health)
 		saiba_fields = set(get_required_fields(policy_type))
@@ -275,38 +358,47 @@ class SaibaValidationService:
 		return list(saiba_fields & ai_fields)
 
 
+def _get_service():
+	"""Return the request's SaibaValidationService, created on first use"""
+	service = getattr(frappe.local, "saiba_validation_service", None)
+	if service is None:
+		service = SaibaValidationService()
+		frappe.local.saiba_validation_service = service
+	return service
+
+
 # Whitelisted API methods
 @frappe.whitelist()
 def validate_motor_policy(policy_name):
 	"""Whitelisted endpoint for Motor Policy validation"""
-	service = SaibaValidationService()
+	service = _get_service()
 	return service.validate_motor_policy(policy_name)
 
 
 @frappe.whitelist()
 def validate_health_policy(policy_name):
 	"""Whitelisted endpoint for Health Policy validation"""
-	service = SaibaValidationService()
+	service = _get_service()
 	return service.validate_health_policy(policy_name)
 
 
 @frappe.whitelist()
 def is_validation_enabled():
 	"""Check if SAIBA validation feature is enabled"""
-	service = SaibaValidationService()
+	service = _get_service()
 	return {"enabled": service.is_enabled()}
 
 
 @frappe.whitelist()
 def get_required_fields(policy_type):
 	"""Return list of required doctype_field names for a policy type"""
-	service = SaibaValidationService()
+	service = _get_service()
 	rules = service.get_validation_rules(policy_type)
-	return [r.doctype_field for r in rules if r.is_required]
+	return [plan.doctype_field for plan in rules]
 
 
 @frappe.whitelist()
 def get_saiba_ai_fields(policy_type):
 	"""Return SAIBA-required fields that are AI-extracted"""
-	service = SaibaValidationService()
+	service = _get_service()
 	return service.get_saiba_ai_fields(policy_type)
@@ -2,15 +2,33 @@
 # For license information, please see license.txt
 
 import frappe
-import time
-from datetime import datetime, timedelta
+from datetime import timedelta
+from frappe.utils import now_datetime
+
+from policy_reader.policy_reader.services.saiba_sync_service import SaibaSyncService
+
+# Set when a stuck document is re-enqueued so overlapping monitor runs do not
+# retry it again while the first retry is still pending
+RETRY_LOCK_KEY = "policy_reader:retry_lock:{}"
+RETRY_LOCK_TTL = 300
 
 
 def monitor_stuck_policy_documents():
     """Monitor and retry stuck Policy Documents every 3 minutes"""
     try:
+        # One timestamp (in the site's timezone) for every cutoff and notification
+        current_time = now_datetime()
+        
         # Find documents stuck in Processing status for more than 5 minutes
-        five_minutes_ago = datetime.now() - timedelta(minutes=5)
+        five_minutes_ago = current_time - timedelta(minutes=5)
+        
+        # Cheap index probe first; the 30-minute pass below is a subset of this filter,
+        # so an idle system can skip both full queries
+        if not frappe.db.count(
+            "Policy Document",
+            filters={"status": "Processing", "modified": ["<", five_minutes_ago]}
+        ):
+            return
         
         stuck_documents = frappe.get_all(
             "Policy Document",
@@ -18,50 +36,62 @@ def monitor_stuck_policy_documents():
                 "status": "Processing",
                 "modified": ["<", five_minutes_ago]
             },
-            fields=["name", "title", "modified", "owner"]
+            fields=["name", "policy_file", "policy_type", "owner"]
         )
         
         if stuck_documents:
             frappe.logger().info(f"Found {len(stuck_documents)} stuck Policy Documents, attempting retry")
             
+            # Only documents that still have a file and policy type can be retried
+            retry_documents = []
             for doc_info in stuck_documents:
+                if not doc_info.policy_file or not doc_info.policy_type:
+                    frappe.logger().warning(f"Skipping retry for {doc_info.name}: missing policy_file or policy_type")
+                    continue
+                if frappe.cache().get_value(RETRY_LOCK_KEY.format(doc_info.name)):
+                    frappe.logger().info(f"Skipping retry for {doc_info.name}: a retry is already pending")
+                    continue
+                retry_documents.append(doc_info)
+            
+            retry_time = current_time.strftime("%Y-%m-%d %H:%M:%S")
+            
+            if retry_documents:
+                # Reset status for all retried documents in one UPDATE
+                frappe.db.set_value(
+                    "Policy Document",
+                    {"name": ["in", [doc_info.name for doc_info in retry_documents]]},
+                    {"status": "Draft", "error_message": ""}
+                )
+                frappe.db.commit()
+            
+            for doc_info in retry_documents:
                 try:
-                    # Get the full document
-                    doc = frappe.get_doc("Policy Document", doc_info.name)
-                    
-                    # Check if required fields are still present
-                    if not doc.policy_file or not doc.policy_type:
-                        frappe.logger().warning(f"Skipping retry for {doc.name}: missing policy_file or policy_type")
-                        continue
-                    
-                    # Reset status and retry processing
-                    doc.status = "Draft"
-                    doc.error_message = ""
-                    doc.save()
-                    frappe.db.commit()
-                    
-                    # Re-enqueue the job with a new timestamp
-                    timestamp = int(time.time())
+                    # Re-enqueue under a stable job id so a retry already queued or
+                    # running for this document is not duplicated
                     frappe.enqueue(
                         method="policy_reader.policy_reader.doctype.policy_document.policy_document.process_policy_background",
                         queue='short',
                         timeout=180,
                         is_async=True,
-                        job_name=f"policy_ocr_retry_{doc.name}_{timestamp}",
-                        doc_name=doc.name
+                        job_id=f"policy_ocr_retry_{doc_info.name}",
+                        deduplicate=True,
+                        doc_name=doc_info.name
+                    )
+                    frappe.cache().set_value(
+                        RETRY_LOCK_KEY.format(doc_info.name), 1, expires_in_sec=RETRY_LOCK_TTL
                     )
                     
-                    frappe.logger().info(f"Retrying stuck Policy Document: {doc.name}")
+                    frappe.logger().info(f"Retrying stuck Policy Document: {doc_info.name}")
                     
                     # Notify the document owner
                     frappe.publish_realtime(
                         event="policy_processing_retry",
                         message={
-                            "doc_name": doc.name,
+                            "doc_name": doc_info.name,
                             "message": "Processing was stuck and has been automatically retried",
-                            "retry_time": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                            "retry_time": retry_time
                         },
-                        user=doc.owner
+                        user=doc_info.owner
                     )
                     
                 except Exception as e:
@@ -72,7 +102,7 @@ def monitor_stuck_policy_documents():
                     continue
         
         # Also check for very old stuck documents (>30 minutes) and mark them as failed
-        thirty_minutes_ago = datetime.now() - timedelta(minutes=30)
+        thirty_minutes_ago = current_time - timedelta(minutes=30)
         
         very_old_stuck = frappe.get_all(
             "Policy Document",
@@ -80,29 +110,34 @@ def monitor_stuck_policy_documents():
                 "status": "Processing",
                 "modified": ["<", thirty_minutes_ago]  
             },
-            fields=["name", "title", "owner"]
+            fields=["name", "owner"]
         )
         
+        if very_old_stuck:
+            frappe.db.set_value(
+                "Policy Document",
+                {"name": ["in", [doc_info.name for doc_info in very_old_stuck]]},
+                {
+                    "status": "Failed",
+                    "error_message": "Processing timed out after 30 minutes. Please try processing again."
+                }
+            )
+            frappe.db.commit()
+        
         for doc_info in very_old_stuck:
             try:
-                doc = frappe.get_doc("Policy Document", doc_info.name)
-                doc.status = "Failed"
-                doc.error_message = "Processing timed out after 30 minutes. Please try processing again."
-                doc.save()
-                frappe.db.commit()
-                
                 # Notify user
                 frappe.publish_realtime(
                     event="policy_processing_failed",
                     message={
-                        "doc_name": doc.name,
+                        "doc_name": doc_info.name,
                         "message": "Processing timed out and was marked as failed",
                         "status": "Failed"
                     },
-                    user=doc.owner
+                    user=doc_info.owner
                 )
                 
-                frappe.logger().warning(f"Marked very old stuck Policy Document as failed: {doc.name}")
+                frappe.logger().warning(f"Marked very old stuck Policy Document as failed: {doc_info.name}")
                 
             except Exception as e:
                 frappe.log_error(
@@ -121,7 +156,7 @@ def cleanup_old_processing_jobs():
     """Cleanup function to remove very old jobs - can be called manually if needed"""
     try:
         # Find documents in Processing status older than 1 hour
-        one_hour_ago = datetime.now() - timedelta(hours=1)
+        one_hour_ago = now_datetime() - timedelta(hours=1)
         
         old_processing = frappe.get_all(
             "Policy Document",
@@ -145,4 +180,26 @@ def cleanup_old_processing_jobs():
         frappe.log_error(
             f"Error in cleanup_old_processing_jobs: {str(e)}", 
             "Policy Document Cleanup Error"
-        )
\ No newline at end of file
+        )
+
+
+def drain_saiba_sync_queue():
+    """Sync policies queued for SAIBA by the non-blocking sync endpoints (every minute)"""
+    try:
+        SaibaSyncService().drain_sync_queues()
+    except Exception as e:
+        frappe.log_error(
+            f"Error in drain_saiba_sync_queue: {str(e)}",
+            "SAIBA Sync Queue Error"
+        )
+
+
+def refresh_saiba_token():
+    """Renew the SAIBA token before it expires (every 15 minutes)"""
+    try:
+        SaibaSyncService().refresh_token_if_expiring()
+    except Exception as e:
+        frappe.log_error(
+            f"Error in refresh_saiba_token: {str(e)}",
+            "SAIBA Token Refresh Error"
+        )
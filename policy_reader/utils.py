@@ -1,70 +1,107 @@
 # Copyright (c) 2025, Clapgrow Software and contributors
 # For license information, please see license.txt
 
+import time
+
 import frappe
 from frappe.utils import now
 
+from policy_reader.policy_reader.doctype.policy_reader_settings.policy_reader_settings import (
+	clear_field_mapping_cache,
+	dump_field_mapping,
+)
+from policy_reader.policy_reader.services.common_service import CommonService
+
+# DocTypes whose saves rebuild the stored field mappings -> Single field holding the mapping
+_MAPPED_POLICY_DOCTYPES = {"Motor Policy": "motor_policy_fields", "Health Policy": "health_policy_fields"}
+
+# Each Error Log entry is a DB insert; a failure that repeats on every save is
+# logged at most once per interval per (DocType, error type) in this worker
+_REFRESH_ERROR_LOG_INTERVAL = 60
+_refresh_error_logged_at = {}
+
 
 def refresh_field_mappings_if_policy_doctype(doc, method):
 	"""Refresh field mappings when Motor Policy or Health Policy DocTypes are updated"""
+	# Only trigger for Motor Policy and Health Policy DocTypes
+	if doc.name not in _MAPPED_POLICY_DOCTYPES:
+		return
+	
+	# Refresh at most once per request even if the DocType is saved repeatedly
+	refreshed_flag = f"policy_reader_mapping_refreshed_{doc.name}"
+	if frappe.flags.get(refreshed_flag):
+		return
+	frappe.flags[refreshed_flag] = True
+	
+	# Get Policy Reader Settings (served from the document cache)
 	try:
-		# Only trigger for Motor Policy and Health Policy DocTypes
-		if doc.name not in ["Motor Policy", "Health Policy"]:
-			return
+		settings = frappe.get_cached_doc("Policy Reader Settings")
+	except frappe.DoesNotExistError:
+		return
+	
+	logger = frappe.logger()
+	
+	# Only the settings write is guarded: a rejected write is logged rather than
+	# breaking the DocType save, anything unexpected propagates
+	try:
+		mapping = settings.build_field_mapping_from_doctype(doc.name)
+		mapping_json = dump_field_mapping(mapping)
 		
-		# Get Policy Reader Settings
-		settings = frappe.get_single("Policy Reader Settings")
-		if not settings:
+		# DocType saves that do not change the mapping (permissions, labels...) skip the write
+		container = _MAPPED_POLICY_DOCTYPES[doc.name]
+		if mapping_json == settings.get(container):
+			logger.info("%s field mappings unchanged; skipped auto-refresh", doc.name)
 			return
 		
-		# Refresh field mappings
-		if doc.name == "Motor Policy":
-			motor_mapping = settings.build_field_mapping_from_doctype("Motor Policy")
-			settings.motor_policy_fields = frappe.as_json(motor_mapping)
-			settings.last_field_sync = now()
-			settings.save()
-			
-			frappe.logger().info(f"Auto-refreshed Motor Policy field mappings: {len(motor_mapping)} fields")
-			
-		elif doc.name == "Health Policy":
-			health_mapping = settings.build_field_mapping_from_doctype("Health Policy")
-			settings.health_policy_fields = frappe.as_json(health_mapping)
-			settings.last_field_sync = now()
-			settings.save()
-			
-			frappe.logger().info(f"Auto-refreshed Health Policy field mappings: {len(health_mapping)} fields")
+		frappe.db.set_single_value(
+			"Policy Reader Settings",
+			{container: mapping_json, "last_field_sync": now()},
+		)
 		
-	except Exception as e:
-		# Log error but don't break DocType save operation
-		frappe.log_error(f"Failed to auto-refresh field mappings for {doc.name}: {str(e)}", 
-						"Field Mapping Auto-Refresh Error")
+		logger.info("Auto-refreshed %s field mappings: %d fields", doc.name, len(mapping))
+		
+	except frappe.ValidationError as e:
+		error_key = (doc.name, type(e).__name__)
+		current = time.monotonic()
+		if current - _refresh_error_logged_at.get(error_key, float("-inf")) >= _REFRESH_ERROR_LOG_INTERVAL:
+			_refresh_error_logged_at[error_key] = current
+			frappe.log_error(f"Failed to auto-refresh field mappings for {doc.name}: {str(e)}", 
+							"Field Mapping Auto-Refresh Error")
+		return
+	
+	# set_single_value skips on_update, so drop the cached mappings here
+	clear_field_mapping_cache()
 
 
 def get_field_mapping_for_policy_type(policy_type):
-	"""Get field mapping for a policy type with fallback to hardcoded mappings"""
-	from policy_reader.policy_reader.services.common_service import CommonService
+	"""Get field mapping for a policy type (memoized per worker until the settings change)"""
 	return CommonService.get_field_mapping_for_policy_type(policy_type)
 
 
-
-
-
-
 def initialize_field_mappings():
 	"""Initialize field mappings in Policy Reader Settings (run once)"""
+	logger = frappe.logger()
 	try:
 		# Get or create Policy Reader Settings
-		settings = frappe.get_single("Policy Reader Settings")
+		settings = frappe.get_cached_doc("Policy Reader Settings")
 		
 		# Check if mappings are already initialized
 		if settings.motor_policy_fields and settings.health_policy_fields:
-			frappe.logger().info("Field mappings already initialized")
+			logger.info("Field mappings already initialized")
 			return
 		
-		# Refresh field mappings
-		settings.refresh_field_mappings()
+		# Build only the missing mappings and write them in one set_single_value,
+		# without a full settings save
+		values = {}
+		if not settings.motor_policy_fields:
+			values["motor_policy_fields"] = dump_field_mapping(settings.build_default_field_mapping("motor"))
+		if not settings.health_policy_fields:
+			values["health_policy_fields"] = dump_field_mapping(settings.build_default_field_mapping("health"))
+		values["last_field_sync"] = now()
+		frappe.db.set_single_value("Policy Reader Settings", values)
+		clear_field_mapping_cache()
 		
-		frappe.logger().info("Field mappings initialized successfully")
+		logger.info("Field mappings initialized successfully")
 		return "Field mappings initialized successfully"
 		
 	except Exception as e: